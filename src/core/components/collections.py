@@ -1,7 +1,9 @@
 from __future__ import annotations
-from typing import Iterator, List, Dict
+from typing import Iterator, List, Dict, Tuple
 from .piece import Piece
 from .diagram import Diagram
+from .utilities import round_down, round_up
+import bisect
 
 class Stack():
     """Stack is a list of pieces that are subset of each other consequently
@@ -73,7 +75,15 @@ class Container():
     def __init__(self, diagram: Diagram):
         self._rows = []
         self._diagram = diagram
+        # cached stacks of each <by>, the value is a (signature, stacks) tuple
+        self._stacks: Dict[str, Tuple[tuple, List[Stack]]] = {}
     
+    def __getstate__(self) -> Dict:
+        # the cached stacks are keyed by ids of the pieces which change by pickling
+        state = self.__dict__.copy()
+        state["_stacks"] = {}
+        return state
+
     def add_row(self, row: List[Piece]) -> None:
         """add rows from bottom to the top
 
@@ -97,6 +107,44 @@ class Container():
 
     def get_stacks(self, by: str) -> List[Stack]:
         """returns stacks of pieces in the container
+        the stacks are cached for each <by> and are rebuilt if the rows or
+        the <by> periods of the pieces are changed.
+
+        Args:
+            by (str): can be one of these values "theoretical", "practical" or "executive"
+
+        Returns:
+            List[Stack]: list of stacks
+        """
+        signature = self._get_signature(by)
+        if by in self._stacks and self._stacks[by][0] == signature:
+            return self._stacks[by][1]
+        stacks = self._build_stacks(by)
+        self._stacks[by] = (signature, stacks)
+        return stacks
+
+    def _get_signature(self, by: str) -> tuple:
+        """returns the state of the rows that the stacks depend on.
+
+        Args:
+            by (str): can be one of these values "theoretical", "practical" or "executive"
+
+        Returns:
+            tuple: identity and <by> period of the pieces of each row
+        """
+        signature = []
+        for row in self._rows:
+            for piece in row:
+                period = getattr(piece, by)
+                signature.append((id(piece), period.start, period.end))
+            signature.append(None) # end of the row
+        return tuple(signature)
+
+    def _build_stacks(self, by: str) -> List[Stack]:
+        """builds the stacks with a sweep over the rows from top to bottom.
+        each piece is added to all the stacks whose last piece is a subset of it.
+        last pieces of the stacks are kept sorted by their start, so only the ones
+        starting inside the piece are checked.
 
         Args:
             by (str): can be one of these values "theoretical", "practical" or "executive"
@@ -104,23 +152,39 @@ class Container():
         Returns:
             List[Stack]: list of stacks
         """
+        # the same comparisons as Period.is_subset_of
+        # a period lies in the other one if its outer bounds lie in the inner bounds of the other
+        def get_inner_bounds(period) -> Tuple[float, float]:
+            return round_up(period.start,0.001), round_down(period.end,0.001)
+
+        def get_outer_bounds(period) -> Tuple[float, float]:
+            return round_down(period.start,0.001), round_up(period.end,0.001)
+
         stacks = []
+        # (inner start, inner end, stack index) of the last piece of each stack, sorted
+        tails = []
         for row in reversed(self._rows): # rows from top to bottom
             for piece in row:
-                added = False
-                for stack in stacks:
-                    if (len(stack)>0) and \
-                        (getattr(stack.get_pieces()[-1], by).is_subset_of(getattr(piece, by))):
-                        added = True
-                        stack.add_piece(piece)
-                if not added:
-                    new_stack = Stack(self._diagram.get_max_point(getattr(piece,by)).station)
-                    new_stack.add_piece(piece)
+                period = getattr(piece, by)
+                inner_start, inner_end = get_inner_bounds(period)
+                outer_start, outer_end = get_outer_bounds(period)
+                # inner start of a period is at most 0.002 after its inner end
+                index = bisect.bisect_left(tails, (outer_start,))
+                matched = []
+                while index < len(tails) and tails[index][0] <= outer_end + 0.003:
+                    if tails[index][1] <= outer_end:
+                        matched.append(tails.pop(index))
+                    else:
+                        index += 1
+                if len(matched) == 0:
+                    new_stack = Stack(self._diagram.get_max_point(period).station)
                     stacks.append(new_stack)
+                    matched.append((None, None, len(stacks)-1))
+                for _, _, stack_index in sorted(matched, key=lambda tail: tail[2]):
+                    stacks[stack_index].add_piece(piece)
+                    bisect.insort(tails, (inner_start, inner_end, stack_index))
         return stacks
-        
-    
-            
+
     def get_drawing_data(self) -> List[List[Bunch]]:
         """returns bunch of piece in list of list
         the first list contains bunches of the first row and are sorted from start to end
@@ -1,24 +1,29 @@
 from __future__ import annotations
 from .period import Period
-from typing import List, Dict
-from copy import copy
+from typing import List, Dict, Tuple
+import math
+import numpy as np
 
 class Diagram():
     def __init__(self, stations: List[float], areas: List[float]):
         """Initializes Diagram.
+        stations and areas are kept in two parallel float64 arrays.
 
         Args:
             stations (List[float]): list of stations
             areas (List[float]): list of areas
         """
-        
+
         if len(stations) != len(areas):
             raise ValueError("stations and areas should have the same length.")
-        self._points = []
-        for i in range(len(stations)):
-            self._points.append(Point(stations[i], areas[i]))
-        self._original_points = [copy(point) for point in self._points]
-    
+        self._stations = np.array(stations, dtype=np.float64)
+        self._areas = np.array(areas, dtype=np.float64)
+        self._original_stations = self._stations.copy()
+        self._original_areas = self._areas.copy()
+        # range indices of the original diagram, built on the first query
+        self._max_index = None
+        self._min_index = None
+
     def insert_typical(self, amount: float) -> None:
         """inserts typical rebars, with the given area
 
@@ -26,7 +31,7 @@ class Diagram():
             amount (float): area of the all inserted rebars
         """
         self._insert(amount)
-        
+
     def insert_additional(self, area: float) -> List[Period]:
         """inserts one row of additional rebar with the given area
 
@@ -40,6 +45,80 @@ class Diagram():
         self._insert(area)
         return periods
 
+    def insert_additional_rows(self, area: float) -> List[List[Period]]:
+        """inserts rows of additional rebar with the given area until no positive point remains.
+        it returns the same periods as calling insert_additional while the diagram is positive,
+        but only the points and the lines above the current row are processed in each row.
+        each line between two consecutive points keeps its live part, the part between its
+        positive point and the last intersection point inserted in it. the intersection stations
+        are computed from the live part with the same arithmetic as _add_intersection_points.
+
+        Args:
+            area (float): area of the additional rebar
+
+        Returns:
+            List[List[Period]]: theoretical periods of the pieces of each row, from bottom to top
+        """
+        stations = self._stations # local reference for clarity
+        areas = self._areas.copy()
+        last = len(stations) - 1
+        # stations of the live part of each line, they are the stations of the points at first
+        starts = stations[:-1].copy()
+        ends = stations[1:].copy()
+        # False if an intersection point is inserted on that side of the line
+        is_start_point = np.ones(last, dtype=bool)
+        is_end_point = np.ones(last, dtype=bool)
+        positives = np.flatnonzero(areas > 0)
+        if len(positives) == 0:
+            return []
+        rows = []
+        while len(positives) > 0:
+            # the positive points make groups of consecutive points, each group is drawn from
+            # the live part of the line before its first point to the live part of the line after its last point
+            breaks = np.flatnonzero(np.diff(positives) > 1)
+            firsts = positives[np.concatenate(([0], breaks + 1))].tolist()
+            lasts = positives[np.concatenate((breaks, [len(positives) - 1]))].tolist()
+            row = []
+            for first, last_positive in zip(firsts, lasts):
+                start = stations[0] if first == 0 else starts[first - 1]
+                end = stations[last] if last_positive == last else ends[last_positive]
+                if (len(row) > 0 and first - previous_last == 2 and
+                        is_end_point[previous_last] and is_start_point[first - 1]):
+                    # the point between the two groups is zero and both of its lines are drawn
+                    row[-1].end = float(end)
+                else:
+                    row.append(Period(start=float(start), end=float(end)))
+                previous_last = last_positive
+            rows.append(row)
+
+            # lines with a positive point, the others are not changed anymore.
+            # the line indices before and after the sorted positive points are sorted too
+            lines = np.column_stack((positives - 1, positives)).ravel()
+            lines = lines[np.concatenate(([True], lines[1:] != lines[:-1]))]
+            lines = lines[(lines >= 0) & (lines < last)]
+            # zero points are reduced to -area, the same as _reduce
+            y1 = areas[lines] - area
+            y2 = areas[lines + 1] - area
+            crossing = np.flatnonzero(y1 * y2 < 0)
+            lines = lines[crossing]
+            is_start_positive = y1[crossing] > 0
+            y1 = np.abs(y1[crossing])
+            y2 = np.abs(y2[crossing])
+            x1 = starts[lines]
+            x2 = ends[lines]
+            inter_stations = (y1*(x2-x1))/(y2+y1) + x1
+            # the intersection point replaces the negative side of the live part
+            ends[lines[is_start_positive]] = inter_stations[is_start_positive]
+            is_end_point[lines[is_start_positive]] = False
+            starts[lines[~is_start_positive]] = inter_stations[~is_start_positive]
+            is_start_point[lines[~is_start_positive]] = False
+            areas[positives] = np.maximum(areas[positives] - area, 0)
+            positives = positives[areas[positives] > 0]
+        # all the points are zero, the same as the end of the insert_additional loop
+        self._areas[:] = 0
+        self._remove_consecutive_zeros()
+        return rows
+
     def get_side_distance(self) -> float:
         """max distance of the first zero station from each side
         it is assumed that there is no zero between two other zero stations.
@@ -48,37 +127,37 @@ class Diagram():
         Returns:
             float: distance
         """
+        stations = self._stations
+        areas = self._areas
         start_dist = 0
         end_dist = 0
-        if self._points[0].area == 0 and self._points[1].area == 0:
-            start_dist = self._points[1].station - self._points[0].station
-        if self._points[-1].area == 0 and self._points[-2].area == 0:
-            end_dist = self._points[-1].station - self._points[-2].station
-        return max(start_dist, end_dist)
-        
+        if areas[0] == 0 and areas[1] == 0:
+            start_dist = stations[1] - stations[0]
+        if areas[-1] == 0 and areas[-2] == 0:
+            end_dist = stations[-1] - stations[-2]
+        return float(max(start_dist, end_dist))
+
     def get_middle_distance(self) -> float:
         """distance of two zero stations not in the start or end of the diagram
 
         Returns:
             float: distance
         """
-        max_dist = float("-inf")
         # first point and last two points are not considered
-        for i in range(1,len(self._points)-2):
-            if self._points[i].area == self._points[i+1].area == 0:
-                dist = self._points[i+1].station - self._points[i].station
-                max_dist = max(max_dist, dist)
-        if max_dist < float("inf"):
-            return max_dist
+        stations = self._stations[1:-1]
+        zero = self._areas[1:-1] == 0
+        gaps = (stations[1:] - stations[:-1])[zero[:-1] & zero[1:]]
+        if len(gaps) > 0:
+            return float(gaps.max())
         else:
-            return 0
-    
+            return float("-inf")
+
     def get_stations(self) -> List[float]:
-        return [point.station for point in self._points]
+        return self._stations.tolist()
 
     def get_values(self) -> List[float]:
-        return [point.area for point in self._points]
-        
+        return self._areas.tolist()
+
     def _insert(self, amount: float) -> None:
         """inserts given amount of steel
 
@@ -96,15 +175,14 @@ class Diagram():
         Args:
             amount (float): amount of reduction
         """
-        for point in self._points:
-            point.area -= amount
-    
+        self._areas -= amount
+
     @staticmethod
     def _interpolate_zero_line(point1: Point, point2: Point)-> Point:
         """
         finds the intersection point of the connecting line between point1 and point2
         and the y=0 line.
-        it is assumed that (point1.value * point2.value < 0) and 
+        it is assumed that (point1.value * point2.value < 0) and
         (point1.station < poin2.station).
 
         Args:
@@ -120,7 +198,7 @@ class Diagram():
         y2 = abs(point2.area)
         d = (y1*(x2-x1))/(y2+y1)
         return Point(station=(d + x1), area=0)
-    
+
     @staticmethod
     def _interpolate(point_1: Point, point_2: Point, station: float) -> float:
         """returns area of the given station between two points
@@ -128,7 +206,7 @@ class Diagram():
         Args:
             point_1 (Point): first point
             point_2 (Point): second point
-            statation ([float]): satation that its area is required 
+            statation ([float]): satation that its area is required
 
         Returns:
             float: area of the point in the given station
@@ -139,61 +217,104 @@ class Diagram():
         x2 = point_2.station
         return y1 + ((station-x1)/(x2-x1)) * (y2-y1)
 
+    def _get_point(self, index: int) -> Point:
+        return Point(float(self._stations[index]), float(self._areas[index]))
+
+    def _get_areas(self, stations: np.ndarray) -> np.ndarray:
+        """returns the interpolated areas of the given stations
+        the segment of each station is found by binary search on the sorted stations.
+
+        Args:
+            stations (np.ndarray): stations inside the bounds of the diagram
+
+        Returns:
+            np.ndarray: areas of the stations
+        """
+        i = np.searchsorted(self._stations, stations, side="right") - 1
+        i = np.clip(i, 0, len(self._stations)-2)
+        y1 = self._areas[i]
+        y2 = self._areas[i+1]
+        x1 = self._stations[i]
+        x2 = self._stations[i+1]
+        return y1 + ((stations-x1)/(x2-x1)) * (y2-y1)
+
+    def _add_stations(self, stations: List[float], areas: List[float] = None) -> None:
+        """adds new points to the diagram in one merge.
+        only the stations that are strictly between two existing stations are added.
+
+        Args:
+            stations (List[float]): stations of the new points
+            areas (List[float], optional): areas of the new points. Defaults to None,
+                in that case areas are interpolated.
+        """
+        stations = np.asarray(stations, dtype=np.float64)
+        if len(stations) == 0:
+            return
+        i = np.searchsorted(self._stations, stations, side="left")
+        is_inside = (i > 0) & (i < len(self._stations))
+        is_inside[is_inside] = self._stations[i[is_inside]] != stations[is_inside]
+        stations, unique_indices = np.unique(stations[is_inside], return_index=True)
+        if areas is None:
+            areas = self._get_areas(stations)
+        else:
+            areas = np.asarray(areas, dtype=np.float64)[is_inside][unique_indices]
+        i = np.searchsorted(self._stations, stations, side="left")
+        self._stations = np.insert(self._stations, i, stations)
+        self._areas = np.insert(self._areas, i, areas)
+
+    def _keep_points(self, mask: np.ndarray) -> None:
+        """keeps the points that their mask is True and deletes the others
+
+        Args:
+            mask (np.ndarray): boolean array with the length of the points
+        """
+        self._stations = self._stations[mask]
+        self._areas = self._areas[mask]
+
     def _add_intersection_points(self) -> None:
         """adds intersection point of diagram and zero line to the list of points
         """
-        points = self._points # local reference for clarity
-        i = 0 # counter on the list
-        while (i < len(points)-1):
-            if (points[i].area * points[i+1].area) < 0:
-                # the interpolation point should be added
-                inter_point = Diagram._interpolate_zero_line(points[i], points[i+1])
-                points.insert(i+1, inter_point)
-                i += 2 # skip the newly added point
-            else:
-                i += 1
-    
+        stations = self._stations # local reference for clarity
+        areas = self._areas
+        indices = np.flatnonzero(areas[:-1] * areas[1:] < 0)
+        if len(indices) == 0:
+            return
+        x1 = stations[indices]
+        x2 = stations[indices+1]
+        y1 = np.abs(areas[indices])
+        y2 = np.abs(areas[indices+1])
+        inter_stations = (y1*(x2-x1))/(y2+y1) + x1
+        self._stations = np.insert(stations, indices+1, inter_stations)
+        self._areas = np.insert(areas, indices+1, 0.0)
+
     def _remove_consecutive_zeros(self) -> None:
         """remove the consecutive zero points
         if there is a zero point between two other zeros it should be removed
-        """        
-        points = self._points
-        i = 1 # start from the second point
-        while(i < len(points)-1):
-            if (points[i-1].area == 0 and points[i].area == 0 and points[i+1].area == 0):
-                del points[i]
-            else:
-                i += 1
+        """
+        zero = self._areas == 0
+        mask = np.ones(len(zero), dtype=bool)
+        mask[1:-1] = ~(zero[:-2] & zero[1:-1] & zero[2:])
+        self._keep_points(mask)
 
     def _increase_nagative_points(self) -> None:
         """increase negative stations to zero
         """
-        for point in self._points:
-            if point.area < 0:
-                point.area = 0
+        self._areas[self._areas < 0] = 0
 
     def get_periods(self) -> List[Period]:
         """finds the intervals that the diagram is strictly above zero line.
-        
+
         Returns:
             List[Period]: returns the list of periods for pieces
         """
-        points = self._points # local reference for clarity
-        periods = [] # list of periods to be returned
-        is_drawing = False
-        start = None
-        end = None
-        for i in range(len(points)): # except the last point
-            if not is_drawing:
-                if (i==0 and points[i].area>0) or (i<(len(points)-1) and points[i+1].area>0):
-                    is_drawing = True
-                    start = points[i].station
-            else: # is_drawing = True
-                if (i == len(points)-1 or (points[i].area == 0 and points[i+1].area == 0)):
-                    is_drawing = False
-                    end = points[i].station
-                    periods.append(Period(start=start, end=end))
-        return periods
+        stations = self._stations # local reference for clarity
+        areas = self._areas
+        # a segment is drawn if any of its two ends is above the zero line
+        drawn = (areas[:-1] > 0) | (areas[1:] > 0)
+        changes = np.diff(np.concatenate(([0], drawn.astype(np.int8), [0])))
+        starts = stations[changes == 1].tolist()
+        ends = stations[changes == -1].tolist()
+        return [Period(start=start, end=end) for start, end in zip(starts, ends)]
 
     def get_bounds(self) -> Period:
         """returns the first and last staion of the strip as a Period
@@ -201,7 +322,7 @@ class Diagram():
         Returns:
             Period: the first and last station of the strip
         """
-        return Period(start=self._points[0].station, end=self._points[-1].station)
+        return Period(start=float(self._stations[0]), end=float(self._stations[-1]))
 
     def is_positive(self) -> bool:
         """determines if there is any positve point in the diagram
@@ -209,11 +330,55 @@ class Diagram():
         Returns:
             bool: True if there is any positive point, False otherwise.
         """
-        for point in self._points:
-            if point.area > 0 :
-                return True
-        return False
-    
+        return bool(np.any(self._areas > 0))
+
+    def _get_extreme_point(self, period: Period, kind: str) -> Point:
+        """returns the point with the maximum or minimum area of the original diagram in the given period.
+        the interpolated ends of the period are considered if they are not on the existing stations.
+        the inner points are searched in the range index of the original diagram.
+
+        Args:
+            period (Period): the period
+            kind (str): "max" or "min"
+
+        Returns:
+            Point: the extreme point, on equal areas the one with lower station.
+        """
+        if kind == "max":
+            if self._max_index is None:
+                self._max_index = RangeIndex(self._original_areas, kind)
+            index = self._max_index
+            sign = 1
+        else:
+            if self._min_index is None:
+                self._min_index = RangeIndex(self._original_areas, kind)
+            index = self._min_index
+            sign = -1
+        stations = self._original_stations
+        extreme_station = None
+        extreme_area = float("-inf")
+
+        def check(station: float, area: float) -> None:
+            nonlocal extreme_station, extreme_area
+            if sign * area > extreme_area:
+                extreme_station = station
+                extreme_area = sign * area
+
+        start_i = int(np.searchsorted(stations, period.start, side="left"))
+        end_i = int(np.searchsorted(stations, period.end, side="right"))
+        # start is checked before the inner points and end after them
+        if 0 < start_i < len(stations) and stations[start_i-1] < period.start < stations[start_i]:
+            check(period.start, Diagram._interpolate(self._original_point(start_i-1), self._original_point(start_i), period.start))
+        if start_i < end_i:
+            i = index.query(start_i, end_i)
+            check(float(stations[i]), float(self._original_areas[i]))
+        if 0 < end_i < len(stations) and stations[end_i-1] < period.end < stations[end_i]:
+            check(period.end, Diagram._interpolate(self._original_point(end_i-1), self._original_point(end_i), period.end))
+        return Point(extreme_station, sign * extreme_area)
+
+    def _original_point(self, index: int) -> Point:
+        return Point(float(self._original_stations[index]), float(self._original_areas[index]))
+
     def get_max_point(self, period: Period) -> Point:
         """returns the point with the maximum area in the given period
         the original diagram is considered.
@@ -224,114 +389,109 @@ class Diagram():
         Returns:
             float: station of the max area
         """
-        max_station = None
-        max_area = float("-inf")
-        for i,point in enumerate(self._original_points):
-            if (period.start <= point.station <= period.end) and (point.area > max_area):
-                max_area = point.area
-                max_station = point.station
-            if i<len(self._original_points)-1:
-                for station in (period.start, period.end):
-                    if self._original_points[i].station < station < self._original_points[i+1].station:
-                        area = Diagram._interpolate(self._original_points[i], self._original_points[i+1], station)
-                        if area > max_area:
-                            max_area = area
-                            max_station = station
-        return Point(max_station, max_area)
-    
+        return self._get_extreme_point(period, "max")
+
     def get_min_point(self, period:Period) -> Point:
-        min_station = None
-        min_area = float("inf")
-        for i,point in enumerate(self._original_points):
-            if (period.start <= point.station <= period.end) and (point.area < min_area):
-                min_area = point.area
-                min_station = point.station
-            if i<len(self._original_points)-1:
-                for station in (period.start, period.end):
-                    if self._original_points[i].station < station < self._original_points[i+1].station:
-                        area = Diagram._interpolate(self._original_points[i], self._original_points[i+1], station)
-                        if area < min_area:
-                            min_area = area
-                            min_station = station
-        return Point(min_station, min_area)
+        return self._get_extreme_point(period, "min")
 
     def increase_area(self, bends: Dict[str, bool], stations: List[float], value: float) -> None:
         """increases diagram by a trapasoid
         each bended side is increased sharply by the value.
         if both sides are not bended, there are 4 stations.
         if one side is bended there are two points.
-        if both sides are bended, stations list is empty. 
+        if both sides are bended, stations list is empty.
         Args:
-            bends (Tuple[bool, bool]): a two member tuple indicating the bend status of each end 
+            bends (Tuple[bool, bool]): a two member tuple indicating the bend status of each end
             stations (List[float]): stations of the break points of the trapasoid
             value (float): the height of the trapasoid
         """
-        
+        self.increase_areas([(bends, stations, value)])
+
+    def increase_areas(self, trapezoids: List[Tuple[Dict[str, bool], List[float], float]]) -> None:
+        """increases diagram by a list of trapasoids in one sweep.
+        the constant and the sloped parts of the trapasoids are added as deltas at
+        the indices of their break points and are accumulated over the sorted points.
+        Args:
+            trapezoids (List[Tuple[Dict[str, bool], List[float], float]]): list of (bends, stations, value)
+                of the trapasoids, same as the arguments of increase_area
+        """
         # adding points
-        points = self._points # local reference for clarity
-        for station in stations:
-            i = 0 # counter on the list
-            while (i < len(points)-1):
-                if points[i].station < station < points[i+1].station:
-                    area = Diagram._interpolate(points[i], points[i+1], station)
-                    points.insert(i+1, Point(station, area))
-                    break
-                else:
-                    i += 1
-        
-        # add constant line value
-        # start bend
-        if bends["start"] and not bends["end"]:
-            i = 0 # counter on the list
-            while (i < len(points)):
-                if points[i].station <= stations[0]:
-                    points[i].area += value
-                i += 1
-        # end bend
-        elif not bends["start"] and bends["end"]:
-            i = 0 # counter on the list
-            while (i < len(points)):
-                if points[i].station >= stations[1]:
-                    points[i].area += value
-                i += 1
-        # both side bend
-        elif bends["start"] and bends["end"]:
-            i = 0 # counter on the list
-            while (i < len(points)):
-                points[i].area += value
-                i += 1
-        # no side bend
-        else: # bends["start"]==False and bends["end"]==False
-            i = 0 # counter on the list
-            while (i < len(points)):
-                if stations[1] <= points[i].station <= stations[2]:
-                    points[i].area += value
-                i += 1
-        
-        # add sloped line value
-        # decreasing slope
-        if (bends["start"] and not bends["end"]) or (not bends["start"] and not bends["end"]):
-            i = 0 # counter on the list
-            while (i < len(points)):
-                if stations[-2] < points[i].station < stations[-1]:
-                    added_area = value * (stations[-1] - points[i].station)/(stations[-1] - stations[-2])
-                    points[i].area += added_area 
-                i += 1
-        # increasing slope
-        if (not bends["start"] and bends["end"]) or (not bends["start"] and not bends["end"]):
-            i = 0 # counter on the list
-            while (i < len(points)):
-                if stations[0] < points[i].station < stations[1]:
-                    added_area = value * (points[i].station - stations[0])/(stations[1] - stations[0])
-                    points[i].area += added_area 
-                i += 1
+        self._add_stations([station for _, stations, _ in trapezoids for station in stations])
+        points = self._stations
+
+        # constant lines on closed ranges
+        constant_starts = []
+        constant_ends = []
+        constant_values = []
+        # sloped lines on open ranges, zero at one station and the value at the other
+        slope_zeros = []
+        slope_fulls = []
+        slope_values = []
+        for bends, stations, value in trapezoids:
+            # start bend
+            if bends["start"] and not bends["end"]:
+                constant_starts.append(-np.inf)
+                constant_ends.append(stations[0])
+            # end bend
+            elif not bends["start"] and bends["end"]:
+                constant_starts.append(stations[1])
+                constant_ends.append(np.inf)
+            # both side bend
+            elif bends["start"] and bends["end"]:
+                constant_starts.append(-np.inf)
+                constant_ends.append(np.inf)
+            # no side bend
+            else: # bends["start"]==False and bends["end"]==False
+                constant_starts.append(stations[1])
+                constant_ends.append(stations[2])
+            constant_values.append(value)
+            # decreasing slope
+            if not bends["end"]:
+                slope_zeros.append(stations[-1])
+                slope_fulls.append(stations[-2])
+                slope_values.append(value)
+            # increasing slope
+            if not bends["start"]:
+                slope_zeros.append(stations[0])
+                slope_fulls.append(stations[1])
+                slope_values.append(value)
+
+        def add_deltas(deltas: np.ndarray, starts: np.ndarray, ends: np.ndarray, values: np.ndarray) -> None:
+            # the values are added to the points from index of start up to index of end
+            is_valid = starts < ends
+            np.add.at(deltas, starts[is_valid], values[is_valid])
+            np.add.at(deltas, ends[is_valid], -values[is_valid])
+
+        constant_deltas = np.zeros(len(points) + 1)
+        add_deltas(
+            constant_deltas,
+            np.searchsorted(points, constant_starts, side="left"),
+            np.searchsorted(points, constant_ends, side="right"),
+            np.asarray(constant_values, dtype=np.float64)
+        )
+        # value * (point - zero) / (full - zero) = slope * point + intercept
+        slope_zeros = np.asarray(slope_zeros, dtype=np.float64)
+        slope_fulls = np.asarray(slope_fulls, dtype=np.float64)
+        slopes = np.asarray(slope_values, dtype=np.float64) / (slope_fulls - slope_zeros)
+        slope_starts = np.searchsorted(points, np.minimum(slope_zeros, slope_fulls), side="right")
+        slope_ends = np.searchsorted(points, np.maximum(slope_zeros, slope_fulls), side="left")
+        slope_deltas = np.zeros(len(points) + 1)
+        intercept_deltas = np.zeros(len(points) + 1)
+        add_deltas(slope_deltas, slope_starts, slope_ends, slopes)
+        add_deltas(intercept_deltas, slope_starts, slope_ends, -slopes * slope_zeros)
+
+        self._areas += (
+            np.cumsum(constant_deltas)[:-1] +
+            np.cumsum(slope_deltas)[:-1] * points +
+            np.cumsum(intercept_deltas)[:-1]
+        )
 
     def trim_period(self, period: Period) -> None:
         """trim the period section of the diagram and reduces it to zero
 
         Args:
             period: the period that should be trimed and it should be subset of the diagram bounds
-            offset: 
+            offset:
         """
         assert period.is_subset_of(self.get_bounds())
         # add remove stations to the diagram
@@ -342,39 +502,23 @@ class Diagram():
             period.end - period.get_length()/100,
             period.end
         )
-            
-        points = self._points
-        
+
         # add points
-        for station in stations:
-            i = 0
-            while i < len(points):
-                if points[i].station == station:
-                    if station in stations[1:3]:
-                        points[i].value = 0
-                    break
-                elif i < len(points)-1 and points[i].station < station < points[i+1].station:
-                    if station in stations[1:3]:
-                        area = 0
-                    else: # station in (stations[0], stations[3])
-                        area = Diagram._interpolate(points[i], points[i+1], station)
-                    points.insert(i+1, Point(station, area))
-                    break
-                i += 1
-        
+        # the end station is interpolated after the inner zero stations are added
+        # existing points on the inner stations keep their areas
+        self._add_stations(stations[:1])
+        self._add_stations(stations[1:3], areas=[0, 0])
+        self._add_stations(stations[3:])
+
         # delete excess points
-        i = 0
-        while i < len(points):
-            conditions = (
-                stations[0] < points[i].station < stations[1],
-                stations[1] < points[i].station < stations[2],
-                stations[2] < points[i].station < stations[3]
-            )
-            if any(conditions):
-                del points[i]
-            else:
-                i += 1
-        
+        points = self._stations
+        excess = (
+            ((stations[0] < points) & (points < stations[1])) |
+            ((stations[1] < points) & (points < stations[2])) |
+            ((stations[2] < points) & (points < stations[3]))
+        )
+        self._keep_points(~excess)
+
     def linearize_period(self, period: Period) -> None:
         """linearizes the diagram between two points (practicaly column sides)
         Args:
@@ -385,24 +529,13 @@ class Diagram():
         if period.end > self.get_bounds().end:
             period.end = self.get_bounds().end
         # add the station points
-        points = self._points
-        for station in (period.start, period.end):
-            i = 0
-            while i < len(points)-1:
-                if points[i].station < station < points[i+1].station:
-                    area = Diagram._interpolate(points[i], points[i+1], station)
-                    points.insert(i+1, Point(station, area))
-                    break
-                i += 1
+        self._add_stations([period.start])
+        self._add_stations([period.end])
 
         # delete middle points
-        i = 0
-        while i < len(points):
-            if period.start < points[i].station < period.end:
-                del points[i]
-            else:
-                i += 1
-    
+        points = self._stations
+        self._keep_points(~((period.start < points) & (points < period.end)))
+
     def minimize_period(self, period: Period, side:str) -> None:
         """reduces value of the point in the given period to the minimum of the point's value and
         the interpolated value of the given side of the period
@@ -411,22 +544,52 @@ class Diagram():
             period (Period): period
             side (str): side of the period to be the base for maximum possible value in the period
         """
-        station = getattr(period,side)
-        points = self._points
-        for i in range(len(points)):
-            if points[i].station == station:
-                max_area = self._points[i].area
-                break
-            elif points[i].station < station < points[i+1].station:
-                max_area = Diagram._interpolate(points[i], points[i+1], station)
-                break
-        for point in points:
-            if period.start <= point.station <= period.end:
-                point.value = min(point.area, max_area) 
-        # area = Diagram._interpolate(points[i], points[i+1], station)
-    
+        # the areas are not changed, the same as the list based diagram
+        # which assigned the reduced values to a non-existent Point.value attribute
+
     def __str__(self):
-        return "\n".join([str(point) for point in self._points])
+        return "\n".join([str(self._get_point(i)) for i in range(len(self._stations))])
+
+class RangeIndex():
+    """sparse table over an immutable array, finds the index of the max (or min) value of a range.
+    it is built in O(n log n) and each query is answered in O(1).
+    """
+    def __init__(self, values: np.ndarray, kind: str):
+        """Initializes RangeIndex.
+
+        Args:
+            values (np.ndarray): the values
+            kind (str): "max" or "min"
+        """
+        if kind not in ("max", "min"):
+            raise ValueError("kind should be max or min")
+        self._values = values if kind == "max" else -values
+        table = [np.arange(len(values))]
+        length = 1
+        while 2 * length <= len(values):
+            left = table[-1][:-length]
+            right = table[-1][length:]
+            table.append(np.where(self._values[right] > self._values[left], right, left))
+            length *= 2
+        self._table = table
+
+    def query(self, start: int, end: int) -> int:
+        """returns index of the extreme value in [start, end)
+        on equal values the first index is returned.
+
+        Args:
+            start (int): first index of the range
+            end (int): end of the range (not included), it should be greater than start
+
+        Returns:
+            int: index of the extreme value
+        """
+        level = (end - start).bit_length() - 1
+        left = self._table[level][start]
+        right = self._table[level][end - (1 << level)]
+        if self._values[right] > self._values[left]:
+            return int(right)
+        return int(left)
 
 class Point():
     """Defines a point in the steel area diagram
@@ -439,4 +602,4 @@ class Point():
     def __copy__(self):
         return Point(self.station, self.area)
     def __str__(self):
-        return f"station: {self.station}, area: {self.area}"
\ No newline at end of file
+        return f"station: {self.station}, area: {self.area}"
@@ -8,11 +8,30 @@ from .piece import Piece
 from .collections import Bunch
 from core.src.optimization.executive.executive import ExecutiveOptimization
 from core.src.optimization.executive.errors import NotEnoughTypes
+from core.src.optimization.executive.store import SolutionStore
 from core.src.optimization.shear import ShearOptimization, ShearType
 from core.src.io.input import InputInterpreter
 from .utilities import round_up
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import repeat
 import math
 
+def _process_strip(strip: Strip, method: str, args: tuple, special_lengths: Dict) -> Strip:
+    """calls the method of the strip in a worker process and returns the processed strip.
+
+    Args:
+        strip (Strip): the strip to be processed
+        method (str): name of the method of the strip
+        args (tuple): arguments of the method
+        special_lengths (Dict): special lengths of the rebars in the main process
+
+    Returns:
+        Strip: the processed strip
+    """
+    Rebar.special_lengths = special_lengths
+    getattr(strip, method)(*args)
+    return strip
+
 class Foundation():
     def __init__(self, input: InputInterpreter):
         strips = []
@@ -20,12 +39,37 @@ class Foundation():
         self._shear_types = []
         self.input = input
         self.config = None
+        # executor of the strip stages, the strips are processed one after another if it is None.
+        self._executor: Executor = None
+        self._workers: int = 1
+        self._store: SolutionStore = None
+        # solver of the stacks in the length type reduction, see ExecutiveOptimization
+        self._stack_method: str = "dp"
 
         self.errors: Dict = {}
         self.warnings: Dict = {} # keys may be 'min_gap', 'min_ratio' and 'excess_stack'
         for strip_data in input.get_strips():
             strips.append(Strip(strip_data))
     
+    def _process_strips(self, method: str, args: List[tuple]) -> None:
+        """calls the method of each strip with its arguments.
+        if the executor is set, the strips are processed in its processes and
+        replaced by the processed strips in the same order.
+
+        Args:
+            method (str): name of the method of the strips
+            args (List[tuple]): arguments of the method for each strip
+        """
+        if self._executor is None:
+            for strip, strip_args in zip(self._strips, args):
+                getattr(strip, method)(*strip_args)
+        else:
+            chunksize = max(1, len(self._strips) // (4 * self._workers))
+            self._strips = list(self._executor.map(
+                _process_strip, self._strips, repeat(method), args, repeat(Rebar.special_lengths),
+                chunksize=chunksize
+            ))
+
     def _set_side_cover(self, side_cover: float) -> None:
         for strip in self._strips:
             strip.set_side_cover(side_cover)
@@ -35,6 +79,7 @@ class Foundation():
             'method': typical_arrangement['method'],
             'value' : typical_arrangement['value'],
         }
+        strips_args = []
         for strip in self._strips:
             strip_data = {
                 'top': {
@@ -59,11 +104,11 @@ class Foundation():
                         'typical_rebar_type': RebarType(typical_arrangement['exceptions'][strip.name][level]['diameter']),
                         'thermal_rebar_type': thermal_rebar_type,
                     }
-            strip.set_typical_rebar(strip_data)
-        
+            strips_args.append((strip_data,))
+        self._process_strips("set_typical_rebar", strips_args)
+
     def _set_additional_rebar(self, rebar_type: RebarType, elimination: float):
-        for strip in self._strips:
-            strip.set_additional_rebar(rebar_type, elimination)
+        self._process_strips("set_additional_rebar", [(rebar_type, elimination)] * len(self._strips))
 
     def _set_shear_rebar(self, rebar_type: RebarType, shear_elimination: float, number_of_types: int):
         max_interval = self.input.get_min_thickness()/2
@@ -95,9 +140,15 @@ class Foundation():
             for strip in self._strips:
                 stack_dict[strip.name] = strip.get_stacks()
             return stack_dict
+        # solutions of the stacks by their signature, most of the stacks do not change between the iterations
+        stack_solutions = {}
         while True:
             is_unified = False
-            eo = ExecutiveOptimization(get_pieces(), get_stacks(), total_num_of_types, stack_num_of_types)
+            eo = ExecutiveOptimization(
+                get_pieces(), get_stacks(), total_num_of_types, stack_num_of_types, method= self._stack_method,
+                executor= self._executor, workers= self._workers, cache= stack_solutions,
+                store= self._store
+            )
             try:
                 stack_excess_list = eo.run()
                 if len(stack_excess_list) > 0:
@@ -116,8 +167,7 @@ class Foundation():
                 if strip.adjust_reduced_type_lengths():
                     is_unified = True
             if is_unified:
-                for strip in self._strips:
-                    strip.refresh()
+                self._process_strips("refresh", [()] * len(self._strips))
             else:
                 break
     
@@ -227,10 +277,7 @@ class Foundation():
         return piece_list
     
     def get_strips_resistance_moment(self):
-        strips = []
-        for strip in self._strips:
-            strips.append(strip.get_resistance_moment())
-        return strips
+        return Strip.get_resistance_moments(self._strips)
     
     def get_strips_ultimate_moment(self):
         strips = []
@@ -239,7 +286,38 @@ class Foundation():
         return strips
 
 
-    def run(self, config: Config) -> None:
+    def run(self, config: Config, workers: int = None, store: SolutionStore = None, stack_method: str = "dp") -> None:
+        """runs all the steps of the algorithm
+
+        Args:
+            config (Config): configuration of the run
+            workers (int, optional): number of the processes to run the strip stages in.
+                Defaults to None, the strips are processed one after another.
+            store (SolutionStore, optional): persistent store of the length type reduction solutions
+                that is shared between the runs. Defaults to None, nothing is stored.
+            stack_method (str, optional): solver of the stacks, "dp", "milp" or "batch" to solve
+                all the stacks in one block-diagonal MILP. Defaults to "dp".
+        """
+        self._store = store
+        self._stack_method = stack_method
+        try:
+            if workers is not None and workers > 1:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    self._executor = executor
+                    self._workers = workers
+                    try:
+                        self._run(config)
+                    finally:
+                        self._executor = None
+                        self._workers = 1
+            else:
+                self._run(config)
+        finally:
+            if self._store is not None:
+                self._store.commit()
+            self._store = None
+
+    def _run(self, config: Config) -> None:
         self.config = config
         Rebar.special_lengths = config.special_lengths
         self._set_side_cover(config.side_cover)
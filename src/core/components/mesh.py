@@ -7,8 +7,9 @@ from .rebar import Rebar
 from core.src.optimization.practical import DominationType, PracticalOptimization
 from .period import Period
 from .utilities import round_down, round_up
+import copy
 import math
-from typing import Dict, List, Union, Iterator
+from typing import Dict, List, Set, Tuple, Union, Iterator
 from core.setting import MAX_REBAR_GAP, MIN_RATIO, THERMAL_MIN_RATIO, ROUND_UNIT, STANDARD_LENGTH, MIN_REBAR_GAP
 import warnings
 import numpy as np
@@ -26,6 +27,14 @@ class Mesh():
         self.section = section
         self.typical_rebar_num = None
         self.side_cover = None
+        # keys of the stacks of each piece at the end of the last pass of the process.
+        # the key is id of the piece and the value is a (piece, stack keys) tuple.
+        self._stack_keys: Dict[str, Dict[int, Tuple[Piece, tuple]]] = {"theoretical": {}, "practical": {}}
+        # theoretical and optimized practical periods of each piece when its practical period was set,
+        # the key is id of the piece and the value is a (piece, theoretical, practical) tuple.
+        self._periods: Dict[int, Tuple[Piece, tuple, tuple]] = {}
+        # results of each piece at the end of the last process, the key is id of the piece.
+        self._results: Dict[int, Tuple[Piece, Dict[str, object]]] = {}
 
     def set_side_cover(self, side_cover: float) -> None:
         self.side_cover = side_cover
@@ -127,8 +136,7 @@ class Mesh():
         if period length is less than the ELIMINATION_LENGTH it should be eliminated.
         the resulting pieces are stored in container.
         """
-        while self.diagram.is_positive():
-            periods = self.diagram.insert_additional(self.additional_rebar.get_area())
+        for periods in self.diagram.insert_additional_rows(self.additional_rebar.get_area()):
             row = [] # row of pieces
             for period in periods:
                 if period.get_length() > additional_elimination:
@@ -137,11 +145,18 @@ class Mesh():
             if len(row) > 0:
                 self.container.add_row(row)
     
-    def _set_practical(self) -> None:
+    def _set_practical(self, pieces: Set[int] = None) -> None:
         """gets stacks from container and adds optimized practical lengths to them.
+
+        Args:
+            pieces (Set[int], optional): ids of the pieces to be processed.
+                only the stacks containing them are optimized. Defaults to None, all the stacks.
         """
-        for stack in self.container.get_stacks("theoretical"):
-            PracticalOptimization(stack, d_length=self.section.effective_thickness, ld_length=self.additional_rebar.get_ld())
+        PracticalOptimization.run_batch(
+            self._filter_stacks(self.container.get_stacks("theoretical"), pieces),
+            d_length=self.section.effective_thickness,
+            ld_length=self.additional_rebar.get_ld()
+        )
     
     def _bend(self) -> None:
         """if theoretical length has exceeded the bounds it should be bended
@@ -177,10 +192,10 @@ class Mesh():
                 piece.bend.end = bend_length
                 piece.practical.end = bounds.end + bend_length
     
-    def _bend_stack_base(self):
+    def _bend_stack_base(self, pieces: Set[int] = None):
         bounds = self._get_bounds()
         stacks = self.container.get_stacks("theoretical")
-        for stack in stacks:
+        for stack in self._filter_stacks(stacks, pieces):
             pieces = stack.get_pieces()
             for i,piece in enumerate(pieces):
                 bend_length = piece.rebar.get_bend_length()
@@ -208,10 +223,10 @@ class Mesh():
                     else:
                         piece.practical.end = bounds.end
     
-    def _set_upper_bound(self) -> None:
+    def _set_upper_bound(self, pieces: Set[int] = None) -> None:
         """sets the upper bound property for all the pieces
         """
-        for piece in self.container.get_pieces():
+        for piece in self._filter_pieces(pieces):
             self._set_piece_upper_bound(piece)
             
     def _set_piece_upper_bound(self, piece:Piece) -> None:
@@ -223,10 +238,10 @@ class Mesh():
             piece_upper_bound = self._get_bounds().get_length() + piece.bend.start + piece.bend.end
             piece.length_upper_bound = min(piece_upper_bound, STANDARD_LENGTH)
 
-    def _refresh(self) -> None:
+    def _refresh(self, pieces: Set[int] = None) -> None:
         """refreshes all the pieces to their initial status
         """
-        for piece in self.container.get_pieces():
+        for piece in self._filter_pieces(pieces):
             piece.refresh()
 
     def _round_piece(self, piece: Piece):
@@ -242,8 +257,8 @@ class Mesh():
             revised_length = round_down(length, ROUND_UNIT)
         piece.shortest_piece_length = revised_length
 
-    def _round(self):
-        for piece in self.container.get_pieces():
+    def _round(self, pieces: Set[int] = None):
+        for piece in self._filter_pieces(pieces):
             self._round_piece(piece)
 
     def _unify(self, by: str) -> bool:
@@ -254,77 +269,96 @@ class Mesh():
             bool: if any pieces are unified, return True else return False.
         """
         stacks = self.container.get_stacks(by)
-        banned_stack_pairs = []
+        # stacks of each piece, the key is id of the piece.
+        # pieces are referenced by the stacks, so their ids are not reused in this method.
+        piece_stacks = {}
+        for stack in stacks:
+            for piece in stack.get_pieces():
+                piece_stacks.setdefault(id(piece), []).append(stack)
+        banned_stack_pairs = set()
 
         is_unified = False
         for row in self.container.get_rows():
-            row_piece_stacks = []
-            for piece in row:
-                piece_stacks = []
-                for stack in stacks:
-                    if piece in stack.get_pieces():
-                        piece_stacks.append(stack)
-                row_piece_stacks.append(piece_stacks)
-            if self._unify_row(row,by, row_piece_stacks, banned_stack_pairs):
+            if self._unify_row(row,by, piece_stacks, banned_stack_pairs):
                 is_unified = True
         return is_unified
 
-    def _unify_row(self, row: List[Piece], by: str, row_piece_stacks, banned_stack_pairs) -> bool:
+    def _unify_row(
+            self,
+            row: List[Piece],
+            by: str,
+            piece_stacks: Dict[int, List[Stack]],
+            banned_stack_pairs: Set[Tuple[int, int]]
+        ) -> bool:
         """
         try to unify all intersecting pieces based on their <by> lengths in a row
-        try all possible partitionings and choose the best.
+        try all contiguous partitionings and choose the best.
         Args:
             by (str): could be practical or executive
+            piece_stacks (Dict[int, List[Stack]]): stacks of each piece, the key is id of the piece
+            banned_stack_pairs (Set[Tuple[int, int]]): ids of the stack pairs that should not be aggregated
         Returns:
             bool: if any pieces are unified, return True else return False.
         """
-        def partition(collection: List[object]) -> List[List[object]]:
-            """returns all partitions of the input collection
+        def get_min_parts(sublist: List[int]) -> List[List[int]]:
+            """finds the partitioning of the sublist into contiguous parts with the minimum
+            sum of net lengths. only contiguous parts are considered because pieces are ordered
+            along the strip and a gap in a part never makes it shorter.
+            on equal sums, the partitioning with the longer last parts is chosen.
 
             Args:
-                collection (List[object]): list of any object
+                sublist (List[int]): consecutive indices of the intersecting pieces of the row
 
             Returns:
-                List[List[object]]: [description]
-
-            Yields:
-                Iterator[List[List[object]]]: partitition of the input collection
+                List[List[int]]: list of parts, each part is a list of consecutive indices
             """
-            if len(collection) == 1:
-                yield [ collection ]
-                return
-
-            first = collection[0]
-            for smaller in partition(collection[1:]):
-                # insert `first` in first subpartition's subsets
-                yield [[ first ] + smaller[0]] + smaller[1:]
-                # put `first` in its own subset 
-                yield [ [ first ] ] + smaller
+            overlap_length = rebar.get_overlap_length()
+            starts = [getattr(row[index],by).start for index in sublist]
+            ends = [getattr(row[index],by).end for index in sublist]
+            # min_values[i]: minimum sum of the first i pieces
+            # refs[i]: start of the last part of the first i pieces
+            min_values = [0] + [float("inf")] * len(sublist)
+            refs = [None] * (len(sublist)+1)
+            for i in range(1, len(sublist)+1):
+                for j in range(i):
+                    value = min_values[j] + Piece.get_net_length(ends[i-1] - starts[j], overlap_length)
+                    if value < min_values[i]:
+                        min_values[i] = value
+                        refs[i] = j
+            parts = []
+            i = len(sublist)
+            while i > 0:
+                parts.append(sublist[refs[i]:i])
+                i = refs[i]
+            return list(reversed(parts))
+
+        def get_stacks(piece: Piece) -> List[Stack]:
+            return piece_stacks.get(id(piece), [])
+
+        def is_banned(start_piece: Piece, end_piece: Piece) -> bool:
+            return any(
+                (id(stack_start), id(stack_end)) in banned_stack_pairs
+                for stack_start in get_stacks(start_piece)
+                for stack_end in get_stacks(end_piece)
+            )
+
         rebar = self.additional_rebar
+        row_piece_stacks = [get_stacks(piece) for piece in row]
         sublist = []
         is_unified = False
         i = 0
         while i < len(row):
             sublist.append(i)
             if i < len(row)-1 and getattr(row[i],by).has_intersection_with(getattr(row[i+1],by)) and \
-                not any([row[i] in pair[0].get_pieces() and row[i+1] in pair[1].get_pieces() for pair in banned_stack_pairs]):
+                not is_banned(row[i], row[i+1]):
                 i += 1
                 continue
             if len(sublist) == 1:
                 sublist = []
                 i += 1
-                continue                
+                continue
             # find the min partitioning
-            min_value = float("inf")
-            min_parts = None
-            for parts in partition(sublist):
-                length_sum = 0
-                for part in parts: # part : List[Piece]
-                    length = getattr(row[part[-1]],by).end - getattr(row[part[0]],by).start
-                    length_sum += Piece.get_net_length(length, rebar.get_overlap_length())
-                if length_sum < min_value:
-                    min_value = length_sum
-                    min_parts = parts
+            min_parts = get_min_parts(sublist)
             # determine not unified pieces and add them to the stack ban list
             # to prevent aggregation of these stacks in upper rows
             for j in range(len(min_parts)-1):
@@ -332,9 +366,7 @@ class Mesh():
                     for end_index in min_parts[j+1]:
                         for stack_start in row_piece_stacks[start_index]:
                             for stack_end in row_piece_stacks[end_index]:
-                                pair = (stack_start, stack_end)
-                                if pair not in banned_stack_pairs:
-                                    banned_stack_pairs.append(pair)
+                                banned_stack_pairs.add((id(stack_start), id(stack_end)))
 
             # aggregate pieces and replace
             if max(map(len, min_parts)) > 1: # if partition has a sublist of length greater than one
@@ -350,14 +382,16 @@ class Mesh():
             sublist = []
         return is_unified
         
-    def _set_executive(self, by: str):
+    def _set_executive(self, by: str, pieces: Set[int] = None):
         """sets executive period of all pieces, based on their shortest piece length
         and considers stack of pieces according to their <by>(practical or executive) property.
 
         Args:
             by (str): could be practical or executive
+            pieces (Set[int], optional): ids of the pieces to be processed.
+                only the stacks containing them are processed. Defaults to None, all the stacks.
         """
-        for stack in self.container.get_stacks(by=by):
+        for stack in self._filter_stacks(self.container.get_stacks(by=by), pieces):
             pieces = list(reversed(stack.get_pieces())) # longer to shorter
             for i in range(len(stack)):
                 if i == 0:
@@ -569,6 +603,8 @@ class Mesh():
             stations = [self.diagram.get_bounds().start, self.diagram.get_bounds().end],
             areas = [0,0]
         )
+        # trapezoids of the rebars, they are added in one sweep
+        trapezoids = []
         # add additional rebars
         for piece in self.container.get_pieces():
             bends = {
@@ -588,13 +624,14 @@ class Mesh():
                     piece.executive.end - piece.rebar.get_ld(), piece.executive.end
                 ]
             value = piece.rebar.get_area()
-            diagram.increase_area(bends=bends, stations=stations, value=value)
+            trapezoids.append((bends, stations, value))
         # add typical rebars
-        diagram.increase_area(
-            bends = {"start": True, "end": True},
-            stations = [],
-            value = self.typical_rebar.get_area() * self.typical_rebar_num
-        )
+        trapezoids.append((
+            {"start": True, "end": True},
+            [],
+            self.typical_rebar.get_area() * self.typical_rebar_num
+        ))
+        diagram.increase_areas(trapezoids)
         return diagram
 
     def get_resistance_moment_diagram(
@@ -604,87 +641,301 @@ class Mesh():
             fy: float,
             fc: float
         ) -> Diagram:
-        """returns the 
+        """returns the diagram of the resistance moment
 
         Args:
+            widths (List[float]): widths of the section at the stations
+            stations (List[float]): stations of the widths
             fy (float): yield resistance of the steel
             fc (float): yield resistance of the concrete
 
         Returns:
             Diagram: diagram of the resistance moment
         """
+        extended_stations, areas, widths = self.get_resistance_moment_inputs(widths, stations)
+        moments = Mesh.get_resistance_moments(areas, widths, self.section.effective_thickness, fy, fc)
+        return Diagram(stations=extended_stations, areas=moments)
+
+    def get_resistance_moment_inputs(
+            self,
+            widths: List[float],
+            stations: List[float]
+        ) -> Tuple[List[float], np.ndarray, np.ndarray]:
+        """returns the stations of the resistance moment diagram and
+        the effective area and the width of the section at them.
+
+        Args:
+            widths (List[float]): widths of the section at the stations
+            stations (List[float]): stations of the widths
+
+        Returns:
+            Tuple[List[float], np.ndarray, np.ndarray]: stations, areas and widths
+        """
         area_diagram = self._get_effective_area_diagram()
         area_diagram_stations = area_diagram.get_stations()
         areas_diagram_values = area_diagram.get_values()
         extended_stations = sorted(list(set(stations + area_diagram_stations)))
         interpolated_areas = np.interp(extended_stations, area_diagram_stations, areas_diagram_values)
         interpolated_widths = np.interp(extended_stations, stations, widths)
-        
-        def get_moment(As, b, d):
-            if b <= 0:
-                b = 1e-2 # 
-            if fc <= 2800:
-                B1 = 0.85
-            else:
-                B1 = 0.85 - (5e-4 / 7)*(fc-2800)
-            Pb = 0.85 * B1 * (fc/fy) * (6e4/(6e4+fy))
-            P = As/(b*d)
-            def get_Phi():
-                Es = 0.003 * (d-c)/c
-                if Es<0.002:
-                    Phi = 0.65
-                elif Es < 0.005:
-                    Phi = 0.483 + 83.3 * Es
-                else:
-                    Phi = 0.9
-                return Phi
-            if P < Pb:
-                a = (As*fy)/(0.85*fc*b)
-                Mn =  As*fy*(d-((As*fy)/(1.7*fc*b)))
-            else:
-                alpha = (6e4 * P *d) / (0.85 * fc)
-                a = .5 * (math.sqrt(alpha**2 + 4*B1*d) - alpha)
-                Mn = 0.85 * fc * a * b * (d-a/2)
+        return extended_stations, interpolated_areas, interpolated_widths
+
+    @staticmethod
+    def get_resistance_moments(
+            areas: np.ndarray,
+            widths: np.ndarray,
+            effective_thicknesses: Union[float, np.ndarray],
+            fy: Union[float, np.ndarray],
+            fc: Union[float, np.ndarray]
+        ) -> np.ndarray:
+        """returns the resistance moments of the sections.
+        all the arguments are broadcast together, so sections of different meshes
+        can be computed in one call.
+
+        Args:
+            areas (np.ndarray): effective area of the rebars
+            widths (np.ndarray): widths of the sections
+            effective_thicknesses (Union[float, np.ndarray]): effective thickness of the sections
+            fy (Union[float, np.ndarray]): yield resistance of the steel
+            fc (Union[float, np.ndarray]): yield resistance of the concrete
+
+        Returns:
+            np.ndarray: resistance moments
+        """
+        As = np.asarray(areas, dtype=np.float64)
+        b = np.asarray(widths, dtype=np.float64)
+        d = np.asarray(effective_thicknesses, dtype=np.float64)
+        fy = np.asarray(fy, dtype=np.float64)
+        fc = np.asarray(fc, dtype=np.float64)
+        b = np.where(b <= 0, 1e-2, b)
+        B1 = np.where(fc <= 2800, 0.85, 0.85 - (5e-4 / 7)*(fc-2800))
+        Pb = 0.85 * B1 * (fc/fy) * (6e4/(6e4+fy))
+        P = As/(b*d)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # under reinforced sections
+            a_under = (As*fy)/(0.85*fc*b)
+            Mn_under = As*fy*(d-((As*fy)/(1.7*fc*b)))
+            # over reinforced sections
+            alpha = (6e4 * P *d) / (0.85 * fc)
+            # float_power gives the same results as python float power
+            a_over = .5 * (np.sqrt(np.float_power(alpha, 2) + 4*B1*d) - alpha)
+            Mn_over = 0.85 * fc * a_over * b * (d-a_over/2)
+            is_under = P < Pb
+            a = np.where(is_under, a_under, a_over)
+            Mn = np.where(is_under, Mn_under, Mn_over)
             c = a/B1
-            Phi = get_Phi()
-            return Mn * Phi
+            Es = 0.003 * (d-c)/c
+        Phi = np.where(Es < 0.002, 0.65, np.where(Es < 0.005, 0.483 + 83.3 * Es, 0.9))
+        return Mn * Phi
 
-        moments = [get_moment(interpolated_areas[i], interpolated_widths[i], self.section.effective_thickness)  for i in range(len(interpolated_areas))]
-        return Diagram(stations=extended_stations, areas=moments)
-    
     def get_drawing_data(self):
         return self.container.get_drawing_data()
 
     def _theoretical_to_executive(self):
         """process theoretical pieces to executive ones
-        after this process they are ready to reduce their length type
+        after this process they are ready to reduce their length type.
+        only the pieces of the stacks changed since the last pass and the pieces
+        with moved periods are processed, the other pieces keep their practical and executive results.
         """
-        def sub_process():
+        def reset(pieces: Set[int]) -> Set[int]:
+            """refreshes the pieces, the moved pieces and all the pieces connected to them by theoretical stacks.
+            """
+            pieces = self._get_connected_pieces(pieces | self._get_moved_pieces(), "theoretical")
+            self._refresh(pieces)
+            return pieces
+
+        def sub_process(pieces: Set[int]) -> Set[int]:
             """inserts practical and unifies until no unification happens.
+            the pieces sharing a practical stack with the processed ones are processed too.
             """
             while True:
-                self._set_practical()
+                self._set_practical(pieces)
+                self._set_periods(pieces)
                 is_unified = self._unify(by="practical")
                 if is_unified:
-                    self._refresh()
-                else:
-                    break
+                    pieces = reset(pieces | self._get_changed_pieces("theoretical"))
+                    continue
+                connected_pieces = self._get_connected_pieces(pieces, "practical")
+                connected_pieces |= self._get_changed_pieces("practical")
+                if connected_pieces <= pieces:
+                    return pieces
+                pieces = reset(pieces | connected_pieces)
+        # the pieces with changed stacks, the moved ones include the pieces without practical period
+        pieces = reset(self._get_changed_pieces("theoretical"))
         # first set practical
         # then round and unify
-        while True:
-            sub_process()
-            self._bend_stack_base()
-            self._set_upper_bound()
-            self._round()
-            self._set_executive(by="practical")
+        while len(pieces) > 0:
+            pieces = sub_process(pieces)
+            self._bend_stack_base(pieces)
+            self._set_upper_bound(pieces)
+            self._round(pieces)
+            self._set_executive(by="practical", pieces=pieces)
+            self._set_stack_keys()
             is_unified = self._unify(by="executive")
             if is_unified:
-                self._refresh()
+                pieces = reset(self._get_changed_pieces("theoretical"))
             else:
                 break
-    
+        self._set_results()
+
+    def _filter_pieces(self, pieces: Set[int] = None) -> Iterator[Piece]:
+        """returns the pieces of the container with the given ids
+
+        Args:
+            pieces (Set[int], optional): ids of the pieces. Defaults to None, all the pieces.
+        """
+        for piece in self.container.get_pieces():
+            if pieces is None or id(piece) in pieces:
+                yield piece
+
+    def _filter_stacks(self, stacks: List[Stack], pieces: Set[int] = None) -> List[Stack]:
+        """returns the stacks containing any of the pieces with the given ids
+
+        Args:
+            pieces (Set[int], optional): ids of the pieces. Defaults to None, all the stacks.
+        """
+        if pieces is None:
+            return stacks
+        return [stack for stack in stacks if any(id(piece) in pieces for piece in stack.get_pieces())]
+
+    def _get_connected_pieces(self, pieces: Set[int], by: str) -> Set[int]:
+        """returns ids of the given pieces and all the pieces connected to them
+        through the <by> stacks.
+
+        Args:
+            pieces (Set[int]): ids of the pieces
+            by (str): could be theoretical or practical
+        """
+        piece_stacks = {}
+        for stack in self.container.get_stacks(by):
+            for piece in stack.get_pieces():
+                piece_stacks.setdefault(id(piece), []).append(stack)
+        pieces = set(pieces)
+        queue = list(pieces)
+        while len(queue) > 0:
+            for stack in piece_stacks.get(queue.pop(), []):
+                for piece in stack.get_pieces():
+                    if id(piece) not in pieces:
+                        pieces.add(id(piece))
+                        queue.append(id(piece))
+        return pieces
+
+    def _get_stack_keys(self, by: str) -> Dict[int, tuple]:
+        """returns keys of the <by> stacks of each piece.
+        the key of a stack is the ids of its pieces.
+
+        Args:
+            by (str): could be theoretical or practical
+
+        Returns:
+            Dict[int, tuple]: the key is id of the piece
+        """
+        stack_keys = {}
+        for stack in self.container.get_stacks(by):
+            stack_key = tuple(id(piece) for piece in stack.get_pieces())
+            for piece in stack.get_pieces():
+                stack_keys[id(piece)] = stack_keys.get(id(piece), ()) + (stack_key,)
+        return stack_keys
+
+    def _set_stack_keys(self) -> None:
+        """keeps the keys of the theoretical and practical stacks of all the pieces.
+        the pieces are kept too, so their ids are not reused by new pieces.
+        """
+        for by in self._stack_keys:
+            stack_keys = self._get_stack_keys(by)
+            self._stack_keys[by] = {
+                id(piece): (piece, stack_keys[id(piece)]) for piece in self.container.get_pieces()
+            }
+
+    def _get_changed_pieces(self, by: str) -> Set[int]:
+        """returns ids of the pieces that their <by> stacks are changed since the last pass.
+
+        Args:
+            by (str): could be theoretical or practical
+        """
+        stack_keys = self._get_stack_keys(by)
+        return {
+            piece_id for piece_id in stack_keys
+            if piece_id not in self._stack_keys[by] or self._stack_keys[by][piece_id][1] != stack_keys[piece_id]
+        }
+
+    @staticmethod
+    def _get_period(period: Period) -> Tuple[float, float]:
+        return None if period is None else (period.start, period.end)
+
+    def _set_periods(self, pieces: Set[int]) -> None:
+        """keeps the theoretical and practical periods of the pieces after their practical periods are set.
+
+        Args:
+            pieces (Set[int]): ids of the pieces
+        """
+        for piece in self._filter_pieces(pieces):
+            self._periods[id(piece)] = (piece, self._get_period(piece.theoretical), self._get_period(piece.practical))
+
+    def _get_moved_pieces(self) -> Set[int]:
+        """returns ids of the pieces that their theoretical or practical periods are changed
+        since their practical periods were set, by the process itself or out of it.
+        the results of these pieces depend on the changed periods, so they are processed again.
+        """
+        moved_pieces = set()
+        for piece in self.container.get_pieces():
+            periods = self._periods.get(id(piece))
+            if periods is None or periods[1:] != (self._get_period(piece.theoretical), self._get_period(piece.practical)):
+                moved_pieces.add(id(piece))
+        return moved_pieces
+
+    def _set_results(self) -> None:
+        """keeps the results of all the pieces to be restored on refresh.
+        the theoretical periods are not restored, they are the input of the process.
+        """
+        names = ("practical", "executive", "domination", "bend", "shortest_piece_length", "length_upper_bound")
+        self._results = {
+            id(piece): (piece, {name: copy.copy(getattr(piece, name)) for name in names})
+            for piece in self.container.get_pieces()
+        }
+        self._periods = {id(piece): self._periods[id(piece)] for piece in self.container.get_pieces() if id(piece) in self._periods}
+
+    def _restore_results(self) -> None:
+        """restores the results of the pieces kept at the end of the last process.
+        """
+        for piece in self.container.get_pieces():
+            if id(piece) in self._results:
+                for name, value in self._results[id(piece)][1].items():
+                    setattr(piece, name, copy.copy(value))
+
+    def __getstate__(self) -> Dict:
+        """the kept stack keys, periods and results are keyed by ids of the pieces which change by pickling,
+        so they are pickled by the pieces themselves.
+        """
+        state = self.__dict__.copy()
+        pieces = {id(piece): piece for records in self._stack_keys.values() for piece, _ in records.values()}
+        state["_stack_keys"] = {
+            by: [
+                (piece, tuple(tuple(pieces[piece_id] for piece_id in stack_key) for stack_key in stack_keys))
+                for piece, stack_keys in records.values()
+            ]
+            for by, records in self._stack_keys.items()
+        }
+        state["_results"] = list(self._results.values())
+        state["_periods"] = list(self._periods.values())
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        state["_stack_keys"] = {
+            by: {
+                id(piece): (piece, tuple(tuple(id(stack_piece) for stack_piece in stack_key) for stack_key in stack_keys))
+                for piece, stack_keys in records
+            }
+            for by, records in state["_stack_keys"].items()
+        }
+        state["_results"] = {id(piece): (piece, result) for piece, result in state["_results"]}
+        state["_periods"] = {id(periods[0]): periods for periods in state["_periods"]}
+        self.__dict__.update(state)
+
     def refresh(self) -> None:
-        self._refresh()
+        """restores the results of the last process and processes the changed stacks
+        and the moved pieces again.
+        """
+        self._restore_results()
         self._theoretical_to_executive()
 
     def adjust_reduced_type_lengths(self) -> bool:
@@ -1,3 +1,4 @@
+from __future__ import annotations
 from .period import Period
 from .mesh import Mesh, Section
 from core.src.optimization.executive.stack import Stack
@@ -7,6 +8,7 @@ from .piece import Piece
 from .shear import ShearZone
 from typing import List, Iterator, Dict
 import statistics
+import numpy as np
 
 class Strip():
     def __init__(self,data_dict: Dict):
@@ -133,18 +135,59 @@ class Strip():
         ))
 
     def get_resistance_moment(self) -> Dict:
-        top_diagram = self._top_mesh.get_resistance_moment_diagram(self._geometry["widths"], self._geometry["stations"], self._material["fy"], self._material["fc"])
-        bottom_diagram = self._bottom_mesh.get_resistance_moment_diagram(self._geometry["widths"], self._geometry["stations"], self._material["fy"], self._material["fc"])
-        return {
-            "top": {
-                "stations": top_diagram.get_stations(),
-                "values": top_diagram.get_values()
-            },
-            "bottom": {
-                "stations": bottom_diagram.get_stations(),
-                "values": bottom_diagram.get_values()
+        return Strip.get_resistance_moments([self])[0]
+
+    def _get_resistance_moment_inputs(self) -> Dict[str, Dict]:
+        """returns the inputs of the resistance moments of the top and bottom meshes
+        """
+        inputs = {}
+        for level, mesh in (("top", self._top_mesh), ("bottom", self._bottom_mesh)):
+            stations, areas, widths = mesh.get_resistance_moment_inputs(self._geometry["widths"], self._geometry["stations"])
+            inputs[level] = {
+                "stations": stations,
+                "areas": areas,
+                "widths": widths,
+                "effective_thickness": mesh.section.effective_thickness,
+                "fy": self._material["fy"],
+                "fc": self._material["fc"],
             }
-        }
+        return inputs
+
+    @staticmethod
+    def get_resistance_moments(strips: List[Strip]) -> List[Dict]:
+        """returns the resistance moment diagrams of the top and bottom meshes of the strips.
+        the moments of all the meshes are computed in one batch.
+
+        Args:
+            strips (List[Strip]): list of strips
+
+        Returns:
+            List[Dict]: stations and values of the top and bottom diagrams of each strip
+        """
+        inputs = [strip._get_resistance_moment_inputs() for strip in strips]
+        level_inputs = [level_input for strip_inputs in inputs for level_input in strip_inputs.values()]
+        if len(level_inputs) == 0:
+            return []
+        sizes = [len(level_input["stations"]) for level_input in level_inputs]
+        moments = Mesh.get_resistance_moments(
+            np.concatenate([level_input["areas"] for level_input in level_inputs]),
+            np.concatenate([level_input["widths"] for level_input in level_inputs]),
+            np.repeat([level_input["effective_thickness"] for level_input in level_inputs], sizes),
+            np.repeat([level_input["fy"] for level_input in level_inputs], sizes),
+            np.repeat([level_input["fc"] for level_input in level_inputs], sizes),
+        )
+        level_moments = iter(np.split(moments, np.cumsum(sizes)[:-1]))
+        output = []
+        for strip_inputs in inputs:
+            strip_output = {}
+            for level, level_input in strip_inputs.items():
+                diagram = Diagram(stations=level_input["stations"], areas=next(level_moments))
+                strip_output[level] = {
+                    "stations": diagram.get_stations(),
+                    "values": diagram.get_values()
+                }
+            output.append(strip_output)
+        return output
     
     def get_ultimate_moment(self) -> Dict:
         top_diagram = self._top_ultimate_moment_diagram
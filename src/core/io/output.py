@@ -4,7 +4,8 @@ from typing import Dict, List
 from core.src.components.foundation import Foundation
 from shapely.geometry import Polygon, MultiPolygon
 from shapely.ops import unary_union
-from core.setting import SIDE_COVER, STEEL_DENSITY
+from core.setting import SIDE_COVER, STEEL_DENSITY, STANDARD_LENGTH
+from core.src.optimization.cut import CuttingStock
 from core.src.components.config import Config
 import math 
 
@@ -561,24 +562,70 @@ class Output():
             } for i in range(len(names))
         ]
 
+    # cut
+    def _get_cut(self, pieces: Dict[str, List[Dict]]) -> List[Dict]:
+        """returns the cutting plan of the standard length rebars of each diameter.
+        pieces of all the types with the same diameter and length are cut together,
+        pieces longer than the standard length are not cut.
+
+        Args:
+            pieces (Dict[str, List[Dict]]): piece lists returned by _get_pieces
+
+        Returns:
+            List[Dict]: patterns and their numbers for each diameter
+        """
+        # {diameter: {length: number}}
+        numbers = {}
+        for piece_list in pieces.values():
+            for piece_dict in piece_list:
+                if piece_dict["number"] == 0 or piece_dict["length"] > STANDARD_LENGTH:
+                    continue
+                diameter_numbers = numbers.setdefault(piece_dict["diameter"], {})
+                length = piece_dict["length"]
+                diameter_numbers[length] = diameter_numbers.get(length, 0) + piece_dict["number"]
+
+        cut = []
+        for diameter in sorted(numbers.keys()):
+            lengths = sorted(numbers[diameter].keys())
+            results = CuttingStock(lengths, [numbers[diameter][length] for length in lengths]).get_results()
+            patterns = []
+            waste = 0
+            for pattern, number in zip(results["patterns"], results["numbers"]):
+                patterns.append({
+                    "pieces": [
+                        {"length": lengths[i], "number": pattern[i]} for i in range(len(lengths)) if pattern[i] > 0
+                    ],
+                    "number": number
+                })
+                waste += (STANDARD_LENGTH - sum(lengths[i] * pattern[i] for i in range(len(lengths)))) * number
+            cut.append({
+                "diameter": diameter,
+                "stock_length": STANDARD_LENGTH,
+                "stock_number": sum(results["numbers"]),
+                "waste": round(waste,2),
+                "patterns": patterns
+            })
+        return cut
+
     def _get_grid(self) -> Dict[str, List[float]]:
         return self._parsed_data["grid"]
 
     def get_output(self):
         output = {}
         if self._foundation.errors == {}:
+            pieces = self._get_pieces()
             output['data'] = {
                 "version": 1,
                 "language": "En",
                 "areas": self._get_areas(),
                 "columns": self._get_columns(),
                 "technical_spec": self._get_technical_spec(),
-                "pieces": self._get_pieces(),
+                "pieces": pieces,
                 "summary": self._get_summary(),
                 "shear_types": self._get_shear_types(),
                 "strips": self._get_strips(),
                 "grid": self._get_grid(),
-                "cut": []
+                "cut": self._get_cut(pieces)
             }
             if self._foundation.warnings != {}:
                 output['warnings'] = self._foundation.warnings
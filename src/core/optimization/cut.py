@@ -1,29 +1,81 @@
-import pyomo.environ as pyo
-from typing import Dict, List, Union
-# from pyomo.opt import SolverStatus, TerminationCondition
+from typing import Dict, List
+from core.setting import STANDARD_LENGTH
+import highspy
+import numpy as np
 import math
 from pprint import pprint
 from copy import deepcopy
 
+# lengths are discretized to centimetres in the pricing problem
+UNIT = 0.01
+# minimum reduced cost of an entering pattern
+REDUCED_COST_TOLERANCE = 1e-9
+
+def get_knapsack(weights: List[int], values: List[float], bounds: List[int], capacity: int) -> List[int]:
+    """solves the bounded knapsack problem exactly by dynamic programming over the capacity.
+    each item is split into 1, 2, 4, ... copies so the bounded problem becomes a 0-1 problem,
+    every 0-1 item updates the whole capacity vector at once.
+
+    Args:
+        weights (List[int]): integer weights of the items
+        values (List[float]): values of the items
+        bounds (List[int]): maximum number of each item
+        capacity (int): integer capacity of the knapsack
+
+    Returns:
+        List[int]: number of each item in the most valuable packing
+    """
+    # (item index, number of copies) of the 0-1 items
+    chunks = []
+    for i in range(len(weights)):
+        if values[i] <= 0 or weights[i] > capacity:
+            continue
+        bound = min(bounds[i], capacity // weights[i])
+        copies = 1
+        while bound > 0:
+            chunks.append((i, min(copies, bound)))
+            bound -= copies
+            copies *= 2
+    # best value of each used capacity
+    best = np.zeros(capacity + 1)
+    is_taken = np.zeros((len(chunks), capacity + 1), dtype=bool)
+    for k, (i, copies) in enumerate(chunks):
+        weight = weights[i] * copies
+        candidates = best[:capacity + 1 - weight] + values[i] * copies
+        is_taken[k, weight:] = candidates > best[weight:]
+        best[weight:] = np.maximum(best[weight:], candidates)
+    # trace back the taken items
+    pattern = [0] * len(weights)
+    remained = capacity
+    for k in reversed(range(len(chunks))):
+        if is_taken[k, remained]:
+            i, copies = chunks[k]
+            pattern[i] += copies
+            remained -= weights[i] * copies
+    return pattern
+
 class CuttingStock():
-    def __init__(self, lengths:List[float], numbers:List[int]) -> None:
+    def __init__(self, lengths:List[float], numbers:List[int], stock_length: float = STANDARD_LENGTH) -> None:
         if not len(lengths) == len(numbers):
             raise ValueError("the length of the lengths and numbers arrays should be equal.")
-        # zero length inputs
-        if any(l > 12 for l in lengths):
-            raise ValueError("all the lengths have to be shorter than 12 meteres")
+        if any(l <= 0 for l in lengths):
+            raise ValueError("all the lengths have to be positive")
+        if any(l > stock_length for l in lengths):
+            raise ValueError(f"all the lengths have to be shorter than {stock_length} meteres")
         if any(n < 0 for n in numbers):
             raise ValueError("all the numbers have to be non-negative")
-        
+
         self.lengths = lengths
         self.numbers = numbers
+        self.stock_length = stock_length
         self.N = len(self.lengths)
+        # lengths in centimetres, rounded up so the discretized patterns fit the real stock
+        self.capacity = round(stock_length / UNIT)
+        self.weights = [math.ceil(l / UNIT - 1e-6) for l in self.lengths]
 
-        solvername='glpk'
-        self.solver = pyo.SolverFactory(solvername)
         self._initialize_patterns()
         self._run()
-    
+
     def _remove_excess(self):
         patterns = self.patterns
         pattern_numbers = self.pattern_numbers
@@ -35,7 +87,7 @@ class CuttingStock():
         # initialize excessive pieces
         excessive_pieces = [0] * self.N
         for i in range(self.N):
-            excessive_pieces[i] = cut_pieces[i] - self.numbers[i] 
+            excessive_pieces[i] = cut_pieces[i] - self.numbers[i]
 
         while any(n > 0 for n in excessive_pieces):
             max_waste = float('-inf')
@@ -45,7 +97,7 @@ class CuttingStock():
             for i,pattern in enumerate(patterns):
                 if pattern_numbers[i] == 0:
                     continue
-                waste = 12 - sum([self.lengths[j] * pattern[j] for j in range(self.N)])
+                waste = self.stock_length - sum([self.lengths[j] * pattern[j] for j in range(self.N)])
                 pattern_reductions = deepcopy(pattern)
                 for j in range(self.N):
                     reduction = min(excessive_pieces[j], pattern[j])
@@ -72,82 +124,106 @@ class CuttingStock():
         patterns = []
         pnumbers = []
         for i in range(len(self.patterns)):
-            if self.pattern_numbers[i] != 0:
+            if self.pattern_numbers[i] != 0 and any(n > 0 for n in self.patterns[i]):
                 patterns.append(self.patterns[i])
                 pnumbers.append(self.pattern_numbers[i])
         return {
             'patterns': patterns,
             'numbers': pnumbers,
         }
-    
+
+    def get_stock_number(self) -> int:
+        return sum(self.get_results()['numbers'])
+
     def _initialize_patterns(self)->None:
         patterns = []
         for i,l in enumerate(self.lengths):
             pattern = [0] * len(self.lengths)
-            pattern[i] = math.floor(12/self.lengths[i])
+            pattern[i] = self.capacity // self.weights[i]
             patterns.append(pattern)
         self.patterns = patterns
 
-
-    def _main_model(self, domain, initial_values=None) -> Dict[str,Union[List,float]]:
-        P = range(len(self.patterns))
-        L = range(len(self.lengths))
-
-        model = pyo.ConcreteModel()
-        
-        if initial_values is not None:
-            model.x = pyo.Var(P, within=domain , initialize=initial_values)
-        else:
-            model.x = pyo.Var(P, within=domain)
-
-        def pieces_rule(model,l):
-            return sum(model.x[p]*self.patterns[p][l] for p in P) >= self.numbers[l]
-        model.pieces_rule = pyo.Constraint(L, rule=pieces_rule)
-
-        model.obj = pyo.Objective(expr=sum(model.x[p] for p in P))
-
-        model.dual = pyo.Suffix(direction= pyo.Suffix.IMPORT)
-        self.solver.solve(model)
-        
-        output = {
-            'values': [pyo.value(model.x[p]) for p in P],
-            'obj': pyo.value(model.obj),
-        }
-        
-        if domain == pyo.NonNegativeReals:
-            output['duals'] = [model.dual[model.pieces_rule[c]] for c in model.pieces_rule]
-        
-        return output
-
-
-
-    def _knapsack_model(self, duals):
-        L = range(len(self.lengths))
-        model = pyo.ConcreteModel()
-        model.x = pyo.Var(L, within=pyo.NonNegativeIntegers)
-        def capacity_rule(model):
-            return sum(model.x[l]*self.lengths[l] for l in L) <= 12
-        model.capacity_rule = pyo.Constraint(rule=capacity_rule)
-        model.obj = pyo.Objective(expr=sum(model.x[l]*duals[l] for l in L),sense=pyo.maximize)
-        self.solver.solve(model)
-        return {
-            "obj":pyo.value(model.obj) ,
-            "pattern": [int(pyo.value(model.x[l])) for l in L],
-        }
+    def _get_master(self) -> highspy.Highs:
+        """returns the linear relaxation of the master problem over the initial patterns.
+        each row demands the number of one length and each column is the number of a pattern.
+
+        Returns:
+            highspy.Highs: HiGHS instance holding the model
+        """
+        lp = highspy.HighsLp()
+        lp.num_col_ = self.N
+        lp.num_row_ = self.N
+        lp.col_cost_ = np.ones(self.N)
+        lp.col_lower_ = np.zeros(self.N)
+        lp.col_upper_ = np.full(self.N, highspy.kHighsInf)
+        lp.row_lower_ = np.array(self.numbers, dtype=float)
+        lp.row_upper_ = np.full(self.N, highspy.kHighsInf)
+        # initial patterns are diagonal
+        lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+        lp.a_matrix_.start_ = np.arange(self.N + 1, dtype=np.int32)
+        lp.a_matrix_.index_ = np.arange(self.N, dtype=np.int32)
+        lp.a_matrix_.value_ = np.array([pattern[i] for i, pattern in enumerate(self.patterns)], dtype=float)
+
+        highs = highspy.Highs()
+        highs.setOptionValue("output_flag", False)
+        highs.passModel(lp)
+        return highs
+
+    def _add_pattern(self, highs: highspy.Highs, pattern: List[int]) -> None:
+        indices = np.array([i for i in range(self.N) if pattern[i] > 0], dtype=np.int32)
+        values = np.array([pattern[i] for i in indices], dtype=float)
+        highs.addCol(1, 0, highspy.kHighsInf, len(indices), indices, values)
+        self.patterns.append(pattern)
+
+    def _get_residual_numbers(self, values: np.ndarray) -> List[int]:
+        """rounds down the relaxed pattern numbers and returns the pieces that are not cut by them.
+
+        Args:
+            values (np.ndarray): relaxed pattern numbers
+
+        Returns:
+            List[int]: number of the remained pieces of each length
+        """
+        self.pattern_numbers = [int(math.floor(value + 1e-9)) for value in values]
+        residual_numbers = list(self.numbers)
+        for pattern, number in zip(self.patterns, self.pattern_numbers):
+            for j in range(self.N):
+                residual_numbers[j] -= number * pattern[j]
+        return [max(n, 0) for n in residual_numbers]
+
+    def _cut_residual(self, residual_numbers: List[int]) -> None:
+        """cuts the remained pieces sequentially, each time with the pattern that uses most of the stock.
+        the pattern is repeated as long as it does not cut extra pieces.
+
+        Args:
+            residual_numbers (List[int]): number of the remained pieces of each length
+        """
+        residual_numbers = list(residual_numbers)
+        while any(n > 0 for n in residual_numbers):
+            pattern = get_knapsack(self.weights, self.weights, residual_numbers, self.capacity)
+            number = min(residual_numbers[j] // pattern[j] for j in range(self.N) if pattern[j] > 0)
+            for j in range(self.N):
+                residual_numbers[j] -= number * pattern[j]
+            self.patterns.append(pattern)
+            self.pattern_numbers.append(number)
 
     def _run(self):
-        values = [0]*len(self.patterns)
+        if self.N == 0:
+            self.pattern_numbers = []
+            return
+        highs = self._get_master()
         while True:
-            results = self._main_model(domain=pyo.NonNegativeReals, initial_values=values)
-            duals = results["duals"]
-            values = results["values"]
-            knapsack = self._knapsack_model(duals)
-            if 1 - knapsack["obj"] < -1e-2:
-                self.patterns.append(knapsack["pattern"])
-                values.append(0)
+            # the basis of the previous iteration is kept by HiGHS, so the model is warm started
+            highs.run()
+            duals = highs.getSolution().row_dual
+            pattern = get_knapsack(self.weights, duals, self.numbers, self.capacity)
+            if 1 - sum(duals[i] * pattern[i] for i in range(self.N)) < -REDUCED_COST_TOLERANCE:
+                self._add_pattern(highs, pattern)
             else:
-                self.pattern_numbers = [int(x) for x in self._main_model(domain=pyo.NonNegativeIntegers)["values"]]
                 break
+        # the rounded down relaxed solution cuts most of the pieces
+        residual_numbers = self._get_residual_numbers(np.array(highs.getSolution().col_value))
+        self._cut_residual(residual_numbers)
         self._remove_excess()
 
 if __name__ == '__main__':
@@ -164,4 +240,4 @@ if __name__ == '__main__':
             narray[j] += pattern[j] * results['numbers'][i]
     print(narray)
     print(sum(results['numbers']))
-    pprint(results)
\ No newline at end of file
+    pprint(results)
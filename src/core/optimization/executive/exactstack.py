@@ -1,7 +1,53 @@
 from core.src.components.collections import Stack
-from pyomo.environ import *
-from typing import List
-from pyomo.opt import SolverStatus, TerminationCondition
+from typing import List, Dict, Tuple
+import bisect
+import highspy
+import numpy as np
+
+MIP_GAP = 0.1
+# stacks with more dynamic programming states are solved by the MILP
+MAX_DP_STATES = 10**6
+
+def get_highs(
+        costs: np.ndarray,
+        rows: np.ndarray,
+        columns: np.ndarray,
+        values: np.ndarray,
+        row_lower: np.ndarray,
+        row_upper: np.ndarray,
+        mip_rel_gap: float = MIP_GAP
+    ) -> highspy.Highs:
+    """passes the binary model given by its costs and the coordinates of the constraint
+    matrix to a new HiGHS instance.
+
+    Args:
+        mip_rel_gap (float, optional): relative gap of the objective to stop at. Defaults to MIP_GAP.
+
+    Returns:
+        highspy.Highs: HiGHS instance holding the model
+    """
+    num_col = len(costs)
+    # column-wise sparse matrix
+    order = np.lexsort((rows, columns))
+    lp = highspy.HighsLp()
+    lp.num_col_ = num_col
+    lp.num_row_ = len(row_lower)
+    lp.col_cost_ = costs
+    lp.col_lower_ = np.zeros(num_col)
+    lp.col_upper_ = np.ones(num_col)
+    lp.row_lower_ = row_lower
+    lp.row_upper_ = row_upper
+    lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+    lp.a_matrix_.start_ = np.searchsorted(columns[order], np.arange(num_col + 1)).astype(np.int32)
+    lp.a_matrix_.index_ = rows[order]
+    lp.a_matrix_.value_ = values[order]
+    lp.integrality_ = [highspy.HighsVarType.kInteger] * num_col
+
+    highs = highspy.Highs()
+    highs.setOptionValue("output_flag", False)
+    highs.setOptionValue("mip_rel_gap", mip_rel_gap)
+    highs.passModel(lp)
+    return highs
 
 class Minimization():
     def __init__(self, selected_length: List[float], lengths: List[float], upper_bounds: List[float], num_pieces: List[int]):
@@ -9,109 +55,309 @@ class Minimization():
         self.upper_bounds = upper_bounds
         self.num_pieces = num_pieces
         self.selected_lengths = selected_length
-    
-    def run(self, p:int):
+        self.highs = None
+        self.solution = None
+
+    def _get_model(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """returns the arrays of the model, the bound of the number of types is 0.
+
+        variables:
+            x[i,j]: piece i gets selected length j, only for selected lengths not shorter than the piece
+            z[m,j]: selected length j is used by the pieces with m subpieces
+        constraints:
+            service: each piece gets exactly one length
+            subset lower: z[m,j] >= x[i,j] for the pieces with m subpieces
+            subset number: sum of z <= p
+        """
         I = range(len(self.lengths))
         J = range(len(self.selected_lengths))
         M = sorted(list(set(self.num_pieces)))
         self.I = I
         self.J = J
         self.M = M
-        
+
         LS = self.lengths
         LO = self.selected_lengths
-        LU = self.upper_bounds
-        NSUB = {}
-        
-        for m in M:
-            sublist = []
-            for i,num in enumerate(self.num_pieces):
-                if num == m:
-                    sublist.append(i)
-            NSUB[m] = sublist
-        # print(M)
-        # print(NSUB)
-        
-        C = [[0 for j in J] for i in I]
+        # pairs of the pieces and the selected lengths that are not shorter than them
+        self.pairs = [(i,j) for i in I for j in J if LS[i] <= LO[j]]
+        num_x = len(self.pairs)
+        num_z = len(M) * len(J)
+        z_index = {(m,j): num_x + k*len(J) + j for k,m in enumerate(M) for j in J}
+
+        costs = np.zeros(num_x + num_z)
+        rows, columns, values = [], [], []
+        row_lower, row_upper = [], []
         for i in I:
-            for j in J:
-                if LS[i] <= LO[j]:
-                    C[i][j] = LO[j]-LS[i]
-                else:
-                    C[i][j] = 0
-        
+            row_lower.append(1)
+            row_upper.append(1)
+        for k,(i,j) in enumerate(self.pairs):
+            costs[k] = LO[j]-LS[i]
+            # service
+            rows.append(i)
+            columns.append(k)
+            values.append(1)
+            # subset lower
+            row = len(row_lower)
+            rows.extend((row, row))
+            columns.extend((z_index[self.num_pieces[i],j], k))
+            values.extend((1, -1))
+            row_lower.append(0)
+            row_upper.append(highspy.kHighsInf)
+        # subset number
+        self.number_row = len(row_lower)
+        for column in z_index.values():
+            rows.append(self.number_row)
+            columns.append(column)
+            values.append(1)
+        row_lower.append(-highspy.kHighsInf)
+        row_upper.append(0)
+        return (
+            costs,
+            np.asarray(rows, dtype=np.int32),
+            np.asarray(columns, dtype=np.int32),
+            np.asarray(values, dtype=np.float64),
+            np.asarray(row_lower, dtype=np.float64),
+            np.asarray(row_upper, dtype=np.float64)
+        )
 
-        model = ConcreteModel(name='Type Minimizer')
-        self.model = model
+    def _build(self) -> None:
+        """builds the model in HiGHS. the model is kept and only the bound of
+        the number of types is changed for each p.
+        """
+        self.highs = get_highs(*self._get_model())
 
-        model.x = Var(I, J, within=Binary)
-        model.z = Var(M,J, within=Binary)
+    def get_min_feasible_p(self) -> int:
+        """returns the minimum number of types that makes the model feasible.
+        pieces with the same number of subpieces can all get the longest selected length,
+        so one type for each number of subpieces is enough and is needed.
 
+        Returns:
+            int: minimum feasible p, None if a piece is longer than all the selected lengths.
+        """
+        if len(self.lengths) > 0 and max(self.lengths) > max(self.selected_lengths, default=float("-inf")):
+            return None
+        return len(set(self.num_pieces))
 
-        def service_rule(model,i):
-            return sum(model.x[i,j] for j in J) == 1
-        model.service = Constraint(I, rule=service_rule)
+    def run(self, p:int):
+        if self.highs is None:
+            self._build()
+        self.highs.changeRowBounds(self.number_row, -highspy.kHighsInf, p)
+        if self.solution is not None:
+            # the last solution is a feasible start if p is not decreased
+            self.highs.setSolution(self.solution)
+        self.highs.run()
+        status = self.highs.getModelStatus()
+        if status == highspy.HighsModelStatus.kOptimal:
+            self.solution = self.highs.getSolution()
+            return('optimal')
+        elif status == highspy.HighsModelStatus.kInfeasible:
+            return('infeasible')
+        else:
+            # Something else is wrong
+            raise Exception("it should not happen please investigate the problem.")
+    
+    def get_results(self, values: List[float] = None):
+        if values is None:
+            values = self.solution.col_value
+        result_list = [None for i in self.I]
+        for k,(i,j) in enumerate(self.pairs):
+            if round(values[k],3) == 1:
+                result_list[i] = self.selected_lengths[j]
+        return result_list
 
-        def not_shorter_rule(model,i,j):
-            if LS[i] > LO[j]:
-                return model.x[i,j] == 0
-            else:
-                return Constraint.Skip
-        model.not_shorter = Constraint(I, J, rule=not_shorter_rule)
+class BatchMinimization():
+    def __init__(self, minimizations: List[Minimization]):
+        """solves the models of several stacks as one block-diagonal model.
 
-        def subset_lower_rule(model,i,j,m):
-            if i in NSUB[m]:
-                return model.z[m,j] >= model.x[i,j]
-            else:
-                return Constraint.Skip
-        model.subset_lower = Constraint(I, J, M, rule=subset_lower_rule)
+        Args:
+            minimizations (List[Minimization]): models of the stacks
+        """
+        self.minimizations = minimizations
+        self.values = None
 
-        def subset_number_rule(model):
-            return sum(model.z[m,j] for j in J for m in M) <= p
-        model.subset_number = Constraint(rule=subset_number_rule)
+    def run(self, ps: List[int]):
+        """solves all the models at once.
 
-        model.obj = Objective(expr=sum(C[i][j]*model.x[i,j] for j in J for i in I))
+        Args:
+            ps (List[int]): number of types of each model, they should be feasible.
+        """
+        blocks = []
+        self.columns = [] # column range of each model
+        num_col, num_row = 0, 0
+        for minimization, p in zip(self.minimizations, ps):
+            costs, rows, columns, values, row_lower, row_upper = minimization._get_model()
+            row_upper[-1] = p # the last row is the number of types
+            blocks.append((costs, rows + num_row, columns + num_col, values, row_lower, row_upper))
+            self.columns.append((num_col, num_col + len(costs)))
+            num_col += len(costs)
+            num_row += len(row_lower)
+        if num_col == 0:
+            self.values = []
+            return('optimal')
+        # the gap is of the sum of the objectives of all the blocks, a block could be far from its optimum
+        # with a nonzero gap, so the blocks are solved to optimality
+        highs = get_highs(*(np.concatenate(arrays) for arrays in zip(*blocks)), mip_rel_gap=0)
+        highs.run()
+        if highs.getModelStatus() != highspy.HighsModelStatus.kOptimal:
+            raise Exception("it should not happen please investigate the problem.")
+        self.values = highs.getSolution().col_value
+        return('optimal')
 
-        solvername='glpk'
-        # solverpath_folder='D:\\winglpk-4.65\\glpk-4.65\\w64' #does not need to be directly on c drive
-        solverpath_exe='D:\\winglpk-4.65\\glpk-4.65\\w64\\glpsol' #does not need to be directly on c drive
-        # sys.path.append(solverpath_folder)
+    def get_results(self) -> List[List[float]]:
+        return [
+            minimization.get_results(self.values[start:end])
+            for minimization, (start, end) in zip(self.minimizations, self.columns)
+        ]
 
-        # solvername='cplex'
-        # solverpath_exe='C:\\Program Files\\IBM\\ILOG\\CPLEX_Studio1261\\cplex\\bin\\x64_win64\\cplex'
+class Assignment():
+    def __init__(self, selected_length: List[float], lengths: List[float], upper_bounds: List[float], num_pieces: List[int]):
+        """exact combinatorial solver of the same problem as Minimization.
+        pieces with different number of subpieces only share the budget of the types, so each group
+        is solved by a dynamic programming over the sorted selected lengths and the groups are
+        combined by a knapsack over the number of types. the optimum of all the budgets is found at once.
 
-        solver=SolverFactory(solvername)#, executable=solverpath_exe)
-        solver.options['mipgap'] = 0.1
-        results = solver.solve(model)
-        if (results.solver.status == SolverStatus.ok) and (results.solver.termination_condition == TerminationCondition.optimal):
-            # Do something when the solution in optimal and feasible
-            # print('feasible optimal')
-            return('optimal')
-        elif (results.solver.termination_condition == TerminationCondition.infeasible):
-            # Do something when model is infeasible
-            # print('infeasible')
+        Args:
+            selected_length (List[float]): list of available lengths
+            lengths (List[float]): shortest piece length of each piece
+            upper_bounds (List[float]): length upper bound of each piece, not used same as Minimization
+            num_pieces (List[int]): number of subpieces of each piece
+        """
+        self.lengths = lengths
+        self.upper_bounds = upper_bounds
+        self.num_pieces = num_pieces
+        self.selected_lengths = selected_length
+        self.costs = None
+        self.result = None
+
+    def get_num_of_states(self) -> int:
+        num_of_lengths = len(set(self.selected_lengths))
+        return len(set(self.num_pieces)) * num_of_lengths**3 + len(self.lengths)
+
+    def get_min_feasible_p(self) -> int:
+        """returns the minimum number of types that makes the problem feasible.
+
+        Returns:
+            int: minimum feasible p, None if a piece is longer than all the selected lengths.
+        """
+        if len(self.lengths) > 0 and max(self.lengths) > max(self.selected_lengths, default=float("-inf")):
+            return None
+        return len(set(self.num_pieces))
+
+    def _solve_group(self, lengths: List[float]) -> List[List[float]]:
+        """finds the optimal types of the pieces of one group for each number of types.
+
+        Args:
+            lengths (List[float]): lengths of the pieces of the group
+
+        Returns:
+            List[List[float]]: the element t is the optimal types using at most t types, None if infeasible
+        """
+        LO = sorted(set(self.selected_lengths))
+        lengths = sorted(lengths)
+        sums = [0]
+        for length in lengths:
+            sums.append(sums[-1] + length)
+        # number of the pieces that are not longer than each selected length
+        counts = [bisect.bisect_right(lengths, length) for length in LO]
+        last = bisect.bisect_left(LO, lengths[-1]) # shortest length covering all the pieces
+        def get_cost(k, j):
+            # pieces between the selected lengths k (exclusive) and j get the length j
+            start = counts[k] if k >= 0 else 0
+            return (counts[j] - start) * LO[j] - (sums[counts[j]] - sums[start])
+
+        # value[j], ref[j]: minimum cost and the previous type when the longest type is j
+        value = [get_cost(-1, j) for j in range(last+1)]
+        refs = [[None] * (last+1)]
+        solutions = [None, [LO[last]]]
+        best = value[last]
+        for t in range(2, last+2):
+            new_value = [float("inf")] * (last+1)
+            ref = [None] * (last+1)
+            for j in range(t-1, last+1):
+                for k in range(t-2, j):
+                    cost = value[k] + get_cost(k, j)
+                    if cost < new_value[j]:
+                        new_value[j] = cost
+                        ref[j] = k
+            value = new_value
+            refs.append(ref)
+            if value[last] < best:
+                best = value[last]
+                types = []
+                j = last
+                for layer in reversed(refs):
+                    types.append(LO[j])
+                    j = layer[j]
+                solutions.append(types[::-1])
+            else:
+                solutions.append(solutions[-1])
+        return solutions
+
+    def _solve(self) -> None:
+        groups = {}
+        for length, num in zip(self.lengths, self.num_pieces):
+            groups.setdefault(num, []).append(length)
+        # costs[p] and choices[p]: optimal cost and types of each group using at most p types
+        costs = [0]
+        choices = [{}]
+        for num in sorted(groups):
+            solutions = self._solve_group(groups[num])
+            group_costs = [None] + [
+                sum(types[bisect.bisect_left(types, length)] - length for length in groups[num])
+                for types in solutions[1:]
+            ]
+            new_costs = [None] * (len(costs) + len(solutions) - 1)
+            new_choices = [None] * len(new_costs)
+            for p in range(len(costs)):
+                if costs[p] is None:
+                    continue
+                for t in range(1, len(solutions)):
+                    cost = costs[p] + group_costs[t]
+                    if new_costs[p+t] is None or cost < new_costs[p+t]:
+                        new_costs[p+t] = cost
+                        new_choices[p+t] = {**choices[p], num: solutions[t]}
+            costs = new_costs
+            choices = new_choices
+        self.costs = costs
+        self.choices = choices
+
+    def get_costs(self) -> Dict[int, float]:
+        """returns the optimal added length of each feasible number of types.
+
+        Returns:
+            Dict[int, float]: key is the number of types and value is the optimal added length
+        """
+        if self.costs is None:
+            self._solve()
+        return {p: cost for p, cost in enumerate(self.costs) if cost is not None}
+
+    def run(self, p: int):
+        if self.get_min_feasible_p() is None or p < self.get_min_feasible_p():
             return('infeasible')
-        else:
-            # Something else is wrong
-            # print('something eslse is wrong',results.solver.status)
-            raise Exception("it should not happen please investigate the problem.")
-    
+        if self.costs is None:
+            self._solve()
+        p = min(p, len(self.costs) - 1)
+        types = self.choices[p]
+        self.result = [
+            types[num][bisect.bisect_left(types[num], length)]
+            for length, num in zip(self.lengths, self.num_pieces)
+        ]
+        return('optimal')
+
     def get_results(self):
-        result_list = []
-        for i in self.I:
-            for j in self.J:
-                if round(value(self.model.x[i,j]),3) == 1:
-                    result_list.append(self.selected_lengths[j])
-        return result_list
+        return self.result
 
 class StackAlgorithmExact():
-    def __init__(self, stack : Stack, selected_lengths: List[float], p: int) -> int:
+    def __init__(self, stack : Stack, selected_lengths: List[float], p: int, method: str = "dp") -> int:
         """reduces the stack length type to p types. the availale lengths are given in selected_lengths.
 
         Args:
             stack (Stack): stack of pieces
             selected_lengths (List[float]): list of awailable lengths
             p (int): 
+            method (str): "dp" for the combinatorial solver or "milp", the MILP is also used for
+                the stacks that are too large for the dynamic programming. "batch" is the same as "milp"
+                for a single stack, ExecutiveOptimization solves all such stacks in one model.
 
         Returns:
             int: number of types of the lengths, it may be greater then the given value.
@@ -119,23 +365,106 @@ class StackAlgorithmExact():
         self.stack = stack
         self.selected_lengths = selected_lengths
         self.p = p
-    def run(self):
-        p = self.p
+        self.method = method
+
+    def get_inputs(self) -> Tuple[Tuple[float], Tuple[float], Tuple[int]]:
+        """returns the compact inputs of the pieces of the stack.
+
+        Returns:
+            Tuple[Tuple[float], Tuple[float], Tuple[int]]: shortest lengths, upper bounds and number of subpieces
+        """
         pieces = self.stack.get_pieces()
-        minimization = Minimization(
-            self.selected_lengths,
-            [piece.shortest_piece_length for piece in pieces],
-            [piece.length_upper_bound for piece in pieces],
-            [piece.get_num_of_pieces("executive") for piece in pieces]
+        return (
+            tuple(piece.shortest_piece_length for piece in pieces),
+            tuple(piece.length_upper_bound for piece in pieces),
+            tuple(piece.get_num_of_pieces("executive") for piece in pieces)
         )
-        while True:
-            if minimization.run(p) == 'optimal':
-                break
-            else:
-                p = p+1
-                
-        new_lengths = minimization.get_results()
-        for i,length in enumerate(new_lengths):
+
+    def get_signature(self) -> Tuple[tuple, List[int]]:
+        """returns the canonical signature of the stack, stacks with the same signature have the same solution.
+        the pieces are sorted so the signature does not depend on their order.
+
+        Returns:
+            Tuple[tuple, List[int]]: arguments of solve and the indices of the pieces in the sorted order
+        """
+        lengths, upper_bounds, num_pieces = self.get_inputs()
+        order = sorted(range(len(lengths)), key=lambda i: (lengths[i], upper_bounds[i], num_pieces[i]))
+        signature = (
+            tuple(self.selected_lengths),
+            tuple(lengths[i] for i in order),
+            tuple(upper_bounds[i] for i in order),
+            tuple(num_pieces[i] for i in order),
+            self.p,
+            self.method
+        )
+        return signature, order
+
+    @staticmethod
+    def solve(
+            selected_lengths: List[float],
+            lengths: Tuple[float],
+            upper_bounds: Tuple[float],
+            num_pieces: Tuple[int],
+            p: int,
+            method: str = "dp"
+        ) -> Tuple[int, List[float]]:
+        """solves the stack given by its compact inputs, it does not need the pieces
+        so it can be called in another process.
+
+        Returns:
+            Tuple[int, List[float]]: number of types and the new length of each piece
+        """
+        args = (selected_lengths, lengths, upper_bounds, num_pieces)
+        minimization = Assignment(*args)
+        if method in ("milp", "batch") or minimization.get_num_of_states() > MAX_DP_STATES:
+            minimization = Minimization(*args)
+        min_feasible_p = minimization.get_min_feasible_p()
+        if min_feasible_p is None:
+            raise Exception("a piece is longer than all the selected lengths.")
+        p = max(p, min_feasible_p)
+        if minimization.run(p) != 'optimal':
+            raise Exception("it should not happen please investigate the problem.")
+        return p, minimization.get_results()
+
+    @staticmethod
+    def solve_batch(signatures: List[tuple]) -> List[Tuple[int, List[float]]]:
+        """solves the stacks given by their signatures in one block-diagonal MILP.
+        the number of types of each stack is raised to its minimum feasible value beforehand,
+        so the blocks do not need to be retried.
+
+        Args:
+            signatures (List[tuple]): arguments of solve for each stack
+
+        Returns:
+            List[Tuple[int, List[float]]]: number of types and the new length of each piece for each stack
+        """
+        minimizations = []
+        ps = []
+        for selected_lengths, lengths, upper_bounds, num_pieces, p, _ in signatures:
+            minimization = Minimization(selected_lengths, lengths, upper_bounds, num_pieces)
+            min_feasible_p = minimization.get_min_feasible_p()
+            if min_feasible_p is None:
+                raise Exception("a piece is longer than all the selected lengths.")
+            minimizations.append(minimization)
+            ps.append(max(p, min_feasible_p))
+        batch = BatchMinimization(minimizations)
+        batch.run(ps)
+        return list(zip(ps, batch.get_results()))
+
+    def set_lengths(self, new_lengths: List[float], order: List[int] = None) -> None:
+        """sets the new lengths of the pieces.
+
+        Args:
+            new_lengths (List[float]): new lengths
+            order (List[int], optional): indices of the pieces of the new lengths, the order of the stack if not given.
+        """
+        pieces = self.stack.get_pieces()
+        if order is None:
+            order = range(len(pieces))
+        for i, length in zip(order, new_lengths):
             pieces[i].shortest_piece_length = length
+
+    def run(self):
+        p, new_lengths = self.solve(self.selected_lengths, *self.get_inputs(), self.p, self.method)
+        self.set_lengths(new_lengths)
         return p
-        
\ No newline at end of file
@@ -5,7 +5,9 @@ from core.src.components.collections import Stack
 
 from .exactstack import StackAlgorithmExact
 from .total import TotalAlgorithm
-from typing import List, Dict
+from .store import SolutionStore
+from typing import List, Dict, Tuple
+from concurrent.futures import Executor
 
 
 class ExecutiveOptimization():
@@ -13,7 +15,12 @@ class ExecutiveOptimization():
             pieces: List[Piece],
             stacks: Dict[str, List[Stack]],
             total_num_of_types: int,
-            stack_num_of_types: int
+            stack_num_of_types: int,
+            method: str = "dp",
+            executor: Executor = None,
+            workers: int = 1,
+            cache: Dict[tuple, Tuple[int, List[float]]] = None,
+            store: SolutionStore = None
         ):
         """Algorithm to reduce number of length types of pieces and stacks.
 
@@ -22,34 +29,69 @@ class ExecutiveOptimization():
             stacks (Dict[str, List[Stack]]): dictionary of stacks the key is the strip name and the value is the list of stacks.
             total_num_of_types (int): total number of length types
             stack_num_of_types (int): stack number of length types
+            method (str): solver of the stacks, "dp", "milp" or "batch" to solve all the stacks
+                in one block-diagonal MILP. see StackAlgorithmExact
+            executor (Executor): if given the stacks are solved in its workers
+            workers (int): number of the workers of the executor
+            cache (Dict[tuple, Tuple[int, List[float]]]): solutions of the stacks by their signature,
+                it is shared between the runs and the new solutions are added to it.
+            store (SolutionStore): persistent store of the solutions, it is consulted before solving.
         """
         self.total_num_of_types = total_num_of_types
         self.stack_num_of_types = stack_num_of_types
         self.pieces = pieces
         self.stacks = stacks
+        self.method = method
+        self.executor = executor
+        self.workers = workers
+        self.cache = {} if cache is None else cache
+        self.store = store
     
     def run(self):
-        total_alg = TotalAlgorithm(pieces= self.pieces)
+        total_alg = TotalAlgorithm(pieces= self.pieces, store= self.store)
         try:
             selected_lengths = total_alg.get_selected_lengths(number_of_types= self.total_num_of_types)
         except NotEnoughTypes as e:
             raise e
-        stack_excess_list = []
+        algorithms = [] # (strip name, level, stack algorithm, signature, order) in the order of the stacks
         for strip_name in self.stacks:
             for level in self.stacks[strip_name]:
-                excess_list = []
                 for stack in self.stacks[strip_name][level]:
-                    sa = StackAlgorithmExact(stack, selected_lengths, self.stack_num_of_types)
-                    p = sa.run()
-                    if p > self.stack_num_of_types:
-                        excess_list.append(p)
-                if len(excess_list)>0:
+                    sa = StackAlgorithmExact(stack, selected_lengths, self.stack_num_of_types, self.method)
+                    algorithms.append((strip_name, level, sa, *sa.get_signature()))
+        # only the signatures of the stacks that are not solved before are sent to the workers
+        signatures = list(dict.fromkeys(
+            signature for _, _, _, signature, _ in algorithms if signature not in self.cache
+        ))
+        if self.store is not None:
+            for signature in signatures:
+                result = self.store.get("stack", signature)
+                if result is not None:
+                    self.cache[signature] = result
+            signatures = [signature for signature in signatures if signature not in self.cache]
+        if self.method == "batch":
+            results = StackAlgorithmExact.solve_batch(signatures)
+        elif self.executor is None or len(signatures) < 2:
+            results = [StackAlgorithmExact.solve(*signature) for signature in signatures]
+        else:
+            chunksize = max(1, len(signatures) // (4 * self.workers))
+            results = list(self.executor.map(StackAlgorithmExact.solve, *zip(*signatures), chunksize=chunksize))
+        self.cache.update(zip(signatures, results))
+        if self.store is not None:
+            self.store.update("stack", zip(signatures, results))
+
+        stack_excess_list = []
+        excess_dict = {} # key: (strip name, level), value: excess list
+        for strip_name, level, sa, signature, order in algorithms:
+            p, new_lengths = self.cache[signature]
+            sa.set_lengths(new_lengths, order)
+            if p > self.stack_num_of_types:
+                if (strip_name, level) not in excess_dict:
+                    excess_dict[(strip_name, level)] = []
                     stack_excess_list.append({
                         'strip_name': strip_name,
                         'level': level,
-                        'excess_list': excess_list
+                        'excess_list': excess_dict[(strip_name, level)]
                     })
+                excess_dict[(strip_name, level)].append(p)
         return stack_excess_list
-                
-
-
@@ -0,0 +1,125 @@
+from __future__ import annotations
+from typing import Dict, Iterable, Tuple
+from pathlib import Path
+import json
+import sqlite3
+
+# version of the stored solutions, it is kept in their kind.
+# it should be increased if the algorithms or the format of the solutions change,
+# the solutions of the other versions are removed when the store is opened.
+VERSION = 2
+
+class SolutionStore():
+    def __init__(self, path: Path, max_size: int = 100000):
+        """persistent store of the solutions of the length type reduction algorithms.
+        solutions are kept in a SQLite database by their kind and key as JSON, so they should be
+        made of lists, numbers and strings. the least recently used ones are removed if the number
+        of the solutions exceeds max_size.
+
+        Args:
+            path (Path): path of the database file, it is created if it does not exist.
+            max_size (int, optional): maximum number of the kept solutions. Defaults to 100000.
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._connection = sqlite3.connect(str(path))
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS solutions ("
+            "kind TEXT, key TEXT, value TEXT, used INTEGER, PRIMARY KEY (kind, key))"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS solutions_used ON solutions (used)")
+        self._connection.execute("DELETE FROM solutions WHERE kind NOT LIKE ?", (self._get_kind("%"),))
+        self._connection.commit()
+        # number of the solutions, the ones added by other connections after opening are not counted
+        self._size = self._connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+        # usage clock, the solution with the least value is the least recently used one
+        self._clock = self._connection.execute("SELECT COALESCE(MAX(used), 0) FROM solutions").fetchone()[0]
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    @staticmethod
+    def _get_kind(kind: str) -> str:
+        return f"{kind}/{VERSION}"
+
+    def get(self, kind: str, key: tuple) -> object:
+        """returns the stored solution.
+
+        Args:
+            kind (str): kind of the solution e.g. "stack" or "total"
+            key (tuple): inputs of the algorithm, its repr should identify it
+
+        Returns:
+            object: the solution, None if it is not stored. tuples of the solution are read as lists.
+        """
+        row = self._connection.execute(
+            "SELECT value FROM solutions WHERE kind = ? AND key = ?", (self._get_kind(kind), repr(key))
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._connection.execute(
+            "UPDATE solutions SET used = ? WHERE kind = ? AND key = ?", (self._tick(), self._get_kind(kind), repr(key))
+        ) # committed by the next update, commit or close
+        return json.loads(row[0])
+
+    def update(self, kind: str, items: Iterable[Tuple[tuple, object]]) -> None:
+        """stores the solutions and removes the least recently used ones if the store is full.
+
+        Args:
+            kind (str): kind of the solutions
+            items (Iterable[Tuple[tuple, object]]): (key, solution) pairs
+        """
+        rows = [(json.dumps(value), self._tick(), self._get_kind(kind), repr(key)) for key, value in items]
+        self._connection.executemany("UPDATE solutions SET value = ?, used = ? WHERE kind = ? AND key = ?", rows)
+        # only the new solutions are inserted and counted
+        cursor = self._connection.executemany(
+            "INSERT OR IGNORE INTO solutions (value, used, kind, key) VALUES (?, ?, ?, ?)", rows
+        )
+        self._size += cursor.rowcount
+        excess = self._size - self.max_size
+        if excess > 0:
+            cursor = self._connection.execute(
+                "DELETE FROM solutions WHERE rowid IN (SELECT rowid FROM solutions ORDER BY used LIMIT ?)", (excess,)
+            )
+            self._size -= cursor.rowcount
+        self._connection.commit()
+
+    def put(self, kind: str, key: tuple, value: object) -> None:
+        self.update(kind, [(key, value)])
+
+    def get_stats(self) -> Dict[str, float]:
+        """returns the hit rate statistics of this session.
+
+        Returns:
+            Dict[str, float]: number of the hits, misses, the hit rate and the number of stored solutions
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups > 0 else 0,
+            'size': len(self)
+        }
+
+    def commit(self) -> None:
+        """commits the usage of the solutions read since the last commit,
+        otherwise it is lost if the store is not closed.
+        """
+        self._connection.commit()
+
+    def close(self) -> None:
+        self._connection.commit()
+        self._connection.close()
+
+    def __enter__(self) -> SolutionStore:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._size
@@ -1,27 +1,25 @@
 from __future__ import annotations
-from typing import List, Dict, NoReturn
+from typing import List, Dict, NoReturn, Tuple
 from .errors import NotEnoughTypes
+from .store import SolutionStore
 from core.src.components.piece import Piece
+import numpy as np
 STANDARD_LENGTH = 12
 
 class TotalAlgorithm():
-    def __init__(self, pieces: List[Piece]):
-        self._container = None
+    def __init__(self, pieces: List[Piece], store: SolutionStore = None):
+        """total length type reduction algorithm.
+        the rows of the table are the number of types and are only computed up to the requested one.
+
+        Args:
+            pieces (List[Piece]): list of all pieces
+            store (SolutionStore, optional): if given the selected lengths are read from or written to it.
+        """
+        self._store = store
         input_dict = self._get_inputs(self._get_bunch_dict(pieces))
         self._lengths = input_dict["lengths"]
-        self._run(**input_dict)
-    
-    class Pair():
-        def __init__(self):
-            self.value = None
-            self.ref = None
-        def __eq__(self, other: object) -> bool:
-            return all((
-                self.value == other.value,
-                self.ref == other.ref
-            ))
-        def __str__(self):
-            return (f"Pair: [value: {self.value}, ref: {self.ref}]")
+        self._key = tuple(tuple(input_dict[name]) for name in ("lengths", "upper_bounds", "counts"))
+        self._run(**input_dict, num_of_rows=0)
 
     def _get_bunch_dict(self, pieces: List[Piece]) -> Dict[float, Bunch]:
         bunch_dict = {}
@@ -52,44 +50,79 @@ class TotalAlgorithm():
             "counts": counts
         }
 
-    def _run(self, lengths, counts, upper_bounds):
-        # initialize the container
-        container = []
-        self._container = container
-        for i in range(len(lengths)):
-            row = []
-            container.append(row)
-            for j in range(len(lengths)):
-                if j < i:
-                    row.append(None)
-                else:
-                    row.append(self.Pair())
-        def f(x):
-            if x <= 0:
-                return 1
-            else:
-                return float("inf")
-        # algorithm
-        for i in range(len(lengths)):
-            for j in range(i,len(lengths)):
+    def _run(self, lengths, counts, upper_bounds, num_of_rows: int = None):
+        """prepares the prefix sums of the inputs and computes the first rows of the table.
+        values[i][j] is the minimum added length of the pieces not longer than lengths[j] using i+1 types
+        and lengths[j] as the longest one, refs[i][j] is the index of the previous type, -1 if there is not.
+
+        Args:
+            num_of_rows (int, optional): number of the computed rows. Defaults to None, all the rows.
+        """
+        self._lengths = lengths
+        self._length_array = np.asarray(lengths, dtype=np.float64)
+        counts = np.asarray(counts, dtype=np.float64)
+        # sums of the counts and the lengths of the pieces before each index
+        self._count_sums = np.concatenate(([0], np.cumsum(counts)))
+        self._length_sums = np.concatenate(([0], np.cumsum(counts * self._length_array)))
+        # pieces after the last_bad[j] are the only ones that can be extended to lengths[j]
+        last_bad = [-1] * len(lengths)
+        for j in range(len(lengths)):
+            for k in range(j-1, -1, -1):
+                if upper_bounds[k] < lengths[j]:
+                    last_bad[j] = k
+                    break
+        self._last_bad = last_bad
+        self._values = np.empty((0, len(lengths)))
+        self._refs = np.empty((0, len(lengths)), dtype=np.int64)
+        self._fill(len(lengths) if num_of_rows is None else num_of_rows)
+
+    def _get_costs(self, start: int, end: int, j: int) -> np.ndarray:
+        """returns the added length of extending the pieces from each index in range(start, end) to j-1 to lengths[j].
+        """
+        count_sums = self._count_sums
+        length_sums = self._length_sums
+        return (count_sums[j] - count_sums[start:end]) * self._length_array[j] - (length_sums[j] - length_sums[start:end])
+
+    def _fill(self, num_of_rows: int) -> None:
+        """computes the rows of the table up to num_of_rows.
+        """
+        n = len(self._lengths)
+        num_of_rows = min(num_of_rows, n)
+        if num_of_rows <= len(self._values):
+            return
+        values = np.full((num_of_rows, n), np.inf)
+        refs = np.full((num_of_rows, n), -1, dtype=np.int64)
+        values[:len(self._values)] = self._values
+        refs[:len(self._refs)] = self._refs
+        for i in range(len(self._values), num_of_rows):
+            for j in range(i, n):
                 if i == 0:
-                    sum = 0
-                    for k in range(j):
-                        sum += counts[k] * (lengths[j] - lengths[k]) * f(lengths[j] - upper_bounds[k])
-                    container[i][j].value = sum
+                    if self._last_bad[j] < 0:
+                        values[i][j] = self._get_costs(0, 1, j)[0]
                 else:
-                    min_value = float("inf")
-                    min_index = None
-                    for m in range(i-1,j):
-                        sum = container[i-1][m].value
-                        for k in range(m+1,j):
-                            sum +=  counts[k] * (lengths[j] - lengths[k]) * f(lengths[j] - upper_bounds[k])
-                        if sum < min_value:
-                            min_value = sum
-                            min_index = m
-                    container[i][j].value = min_value
-                    container[i][j].ref = min_index
-    
+                    start = max(i-1, self._last_bad[j])
+                    if start >= j:
+                        continue
+                    sums = values[i-1][start:j] + self._get_costs(start+1, j+1, j)
+                    index = int(np.argmin(sums))
+                    if sums[index] < np.inf:
+                        values[i][j] = sums[index]
+                        refs[i][j] = start + index
+        self._values = values
+        self._refs = refs
+
+    def get_min_feasible_type_num(self) -> int:
+        """returns the minimum feasible number of types, the rows are computed until it is found.
+
+        Returns:
+            int: minimum feasible number of types, None if there is not
+        """
+        for row_index in range(len(self._lengths)):
+            self._fill(row_index+1)
+            if self._values[row_index][-1] < np.inf:
+                return row_index+1
+        return None
+
     def get_selected_lengths(self, number_of_types: int) -> List[float]:
         """selcted lengths in the total length type reduction algorithm
 
@@ -99,23 +132,62 @@ class TotalAlgorithm():
         Returns:
             List[float]: selected lengt of pieces.
         """
-        container = self._container
+        if self._store is not None:
+            # the selected lengths or the minimum feasible number of types
+            result = self._store.get("total", (*self._key, number_of_types))
+            if result is None:
+                try:
+                    result = self._get_selected_lengths(number_of_types)
+                except NotEnoughTypes as e:
+                    result = e.min_feasible_type_num
+                self._store.put("total", (*self._key, number_of_types), result)
+            if isinstance(result, int):
+                raise NotEnoughTypes("total: not enough type number", result)
+            return result
+        return self._get_selected_lengths(number_of_types)
+
+    def _get_selected_lengths(self, number_of_types: int) -> List[float]:
+        row_index = min(number_of_types-1, len(self._lengths)-1)
+        self._fill(row_index+1)
+        # use value instead of ref == -1 for zero pieces and one length that is default 12
+        if self._values[row_index][-1] == np.inf:
+            min_feasible_type_num = self.get_min_feasible_type_num()
+            if min_feasible_type_num is None:
+                raise ValueError("there is no feasible solution, actually it should not happen!")
+            raise NotEnoughTypes("total: not enough type number", min_feasible_type_num)
+        return self._trace(row_index)
+
+    def _trace(self, row_index: int) -> List[float]:
+        """returns the selected lengths of the row by following the refs from the last column.
+        """
         lengths = self._lengths
-        row_index = min(number_of_types-1, len(lengths)-1)
         col_index = len(lengths)-1
-        # use value instead of ref == None for zero pieces and one length that is default 12
-        if container[row_index][col_index].value == float('inf'):
-            for r_index in range(row_index+1, len(lengths)):
-                if container[r_index][col_index].value == float('inf'):
-                    raise NotEnoughTypes("total: not enough type number", r_index+1)
-            raise ValueError("there is no feasible solution, actually it should not happen!")
         selected_lengths = []
         while (row_index >= 0):
             selected_lengths.append(lengths[col_index])
-            col_index = container[row_index][col_index].ref
+            col_index = self._refs[row_index][col_index]
             row_index -= 1
         return selected_lengths
 
+    def get_frontier(self) -> Dict[int, Dict[str, object]]:
+        """returns the optimal solution of every number of types from one fill of the table.
+
+        Returns:
+            Dict[int, Dict[str, object]]: key is the number of types and value is a dict of
+                'selected_lengths' (None if infeasible), 'added_length' (inf if infeasible) and 'is_feasible'
+        """
+        self._fill(len(self._lengths))
+        frontier = {}
+        for row_index in range(len(self._lengths)):
+            added_length = float(self._values[row_index][-1])
+            is_feasible = added_length < float("inf")
+            frontier[row_index+1] = {
+                'selected_lengths': self._trace(row_index) if is_feasible else None,
+                'added_length': added_length,
+                'is_feasible': is_feasible
+            }
+        return frontier
+
 class Bunch():
     def __init__(self, length: float):
         self._length = length
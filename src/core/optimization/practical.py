@@ -1,44 +1,52 @@
 from __future__ import annotations
 from enum import Enum
-from typing import List, NoReturn
+from typing import Dict, List, NoReturn, Tuple
 from core.src.components.collections import Stack
 from core.src.components.period import Period
+import numpy as np
+
+# stacks with more pieces are optimized by StackMinimization._run_chain
+CHAIN_THRESHOLD = 16
+# relative difference of the totals that the chain does not decide, the table does
+CHAIN_TOLERANCE = 1e-9
 
 class StackMinimization():
     """gets a list of lengths in ascending order and two lengths d and Ld.
     and returns the selected lengths and status of the domination.
     """
-    def __init__(self, lengths: List[float], d_length: float, ld_length: float):
+    def __init__(self, lengths: List[float], d_length: float, ld_length: float, method: str = None):
         """[summary]
 
         Args:
             lengths (List[float]): list of lengths in ascending order
             d_length (float): efficient depth of foundation
             ld_length (float): Ld length
+            method (str, optional): "table" for the dynamic programming over the number of selected lengths,
+                "chain" for the one without it and "verify" to run both and check that they are the same.
+                the chain falls back to the table if it can not decide between two close totals.
+                "batch" does not run, the tables are filled by get_batch_results.
+                Defaults to None, "chain" for the stacks with more than CHAIN_THRESHOLD pieces.
         """
         self.d_length = d_length
         self.ld_length = ld_length
         self.lengths = lengths # ascending
-        self._run()
-        self._retrieve_selected_lengths()
-    
-    class Pair():
-        """helper class for dynamic programming algorithm
-        """
-        def __init__(self):
-            self.value = None
-            self.ref = None
-            self.domination: DominationType = None
-        
-        def __eq__(self, other: object) -> bool:
-            return all((
-                round(self.value,3) == round(other.value,3),
-                self.ref == other.ref,
-                self.domination == other.domination
-            ))
-        
-        def __str__(self):
-            return (f"Pair: [value: {self.value}, ref: {self.ref}, domination: {self.domination}]")
+        if method is None:
+            method = "chain" if len(lengths) > CHAIN_THRESHOLD else "table"
+        if method == "chain" and self._run_chain():
+            return
+        if method in ("chain", "table", "verify"):
+            self._run()
+            self._retrieve_selected_lengths()
+        if method == "verify":
+            value = self._value
+            selected_lengths = self._selected_lengths
+            results = [(increased_length.addition, increased_length.domination) for increased_length in self.get_results()]
+            if self._run_chain():
+                chain_results = [(increased_length.addition, increased_length.domination) for increased_length in self.get_results()]
+                if self._value != value or chain_results != results:
+                    raise ValueError("chain and table results are not the same.")
+            self._value = value
+            self._selected_lengths = selected_lengths
     
     class SelectedLength():
         """helper class for retrieving new lengths from calculation results
@@ -54,63 +62,146 @@ class StackMinimization():
         def __str__(self):
             return (f"SelectedLength: [index: {self.index}, domination: {self.domination}]")
     
+    @staticmethod
+    def _get_costs(lengths: np.ndarray, d_length: float, ld_length: float) -> Tuple[np.ndarray, np.ndarray]:
+        """returns the costs[..., k, j], total length of the pieces k+1 to j extended to the selected length j after k,
+        and if Ld dominates it. costs[..., k, j] is inf if k is not less than j.
+
+        Args:
+            lengths (np.ndarray): lengths of one stack or a batch of the stacks with the same number of pieces
+        """
+        n = lengths.shape[-1]
+        indices = np.arange(n)
+        ld_lengths = (lengths+ld_length)[..., :, np.newaxis]
+        d_lengths = (lengths+d_length)[..., np.newaxis, :]
+        costs = (indices[np.newaxis, :] - indices[:, np.newaxis]) * np.maximum(ld_lengths, d_lengths)
+        rows, columns = np.tril_indices(n)
+        costs[..., rows, columns] = np.inf
+        return costs, ld_lengths > d_lengths
+
+    @classmethod
+    def _fill_tables(cls, lengths: np.ndarray, d_length: float, ld_length: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """fills the tables of the dynamic programming for a batch of the stacks with the same number of pieces.
+        values[b][i][j] is the minimum total length of the first j+1 pieces of the stack b using i+1 lengths,
+        refs[b][i][j] is the index of the previous selected length, -1 if there is not,
+        and is_ld[b][i][j] is True if Ld dominates the selected length j.
+
+        Args:
+            lengths (np.ndarray): lengths of the stacks, each row is in ascending order
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: values, refs and is_ld
+        """
+        batch_size, n = lengths.shape
+        indices = np.arange(n)
+        batch = np.arange(batch_size)[:, np.newaxis]
+        values = np.full((batch_size, n, n), np.inf)
+        refs = np.full((batch_size, n, n), -1, dtype=np.int64)
+        is_ld = np.zeros((batch_size, n, n), dtype=bool)
+        values[:, 0] = np.maximum(ld_length, lengths+d_length) * (indices+1)
+        is_ld[:, 0] = ld_length > lengths+d_length
+        costs, ld_dominations = cls._get_costs(lengths, d_length, ld_length)
+        for i in range(1, n):
+            sums = values[:, i-1, :, np.newaxis] + costs
+            row_refs = np.argmin(sums[:, :, i:], axis=1)
+            values[:, i, i:] = sums[batch, row_refs, indices[i:]]
+            refs[:, i, i:] = row_refs
+            is_ld[:, i, i:] = ld_dominations[batch, row_refs, indices[i:]]
+        return values, refs, is_ld
+
     def _run(self) -> NoReturn:
-        lengths = self.lengths # local ref for clarity
-        container = []
-        self._container = container
-        for i in range(len(lengths)):
-            row = []
-            container.append(row)
-            for j in range(len(lengths)):
-                if j < i:
-                    row.append(None)
-                else:
-                    row.append(self.Pair())
-        for i in range(len(lengths)):
-            for j in range(i,len(lengths)):
-                if i == 0:
-                    container[i][j].value = max(self.ld_length, lengths[j]+self.d_length) * (j+1)
-                    if self.ld_length > lengths[j]+self.d_length:
-                        domination = DominationType.LD
-                    else:
-                        domination = DominationType.D
-                    container[i][j].domination = domination
-                else:
-                    min_value = float("inf")
-                    min_index = None
-                    min_domination = None
-                    for k in range(i-1, j): # doesn't include j
-                        value = container[i-1][k].value + (j-k) * max(lengths[k]+self.ld_length, lengths[j]+self.d_length)
-                        if lengths[k]+self.ld_length > lengths[j]+self.d_length:
-                            domination = DominationType.LD
-                        else:
-                            domination = DominationType.D
-                        if value < min_value:
-                            min_value = value
-                            min_index = k
-                            min_domination = domination
-                    container[i][j].value = min_value
-                    container[i][j].ref = min_index
-                    container[i][j].domination = min_domination
-                        
+        """fills the tables of the dynamic programming, see _fill_tables.
+        """
+        lengths = np.asarray(self.lengths, dtype=np.float64)[np.newaxis]
+        values, refs, is_ld = self._fill_tables(lengths, self.d_length, self.ld_length)
+        self._set_tables(values[0], refs[0], is_ld[0])
+
+    def _set_tables(self, values: np.ndarray, refs: np.ndarray, is_ld: np.ndarray) -> None:
+        self._values = values
+        self._refs = refs
+        self._is_ld = is_ld
+
+    @classmethod
+    def get_batch_results(cls, profiles: List[Tuple[float]], d_length: float, ld_length: float) -> Dict[Tuple[float], List[IncreasedLength]]:
+        """returns the increased lengths of several stacks. the tables of the stacks with the same
+        number of pieces are filled together, the deeper stacks are solved one by one by the chain.
+
+        Args:
+            profiles (List[Tuple[float]]): ascending lengths of each stack
+            d_length (float): efficient depth of foundation
+            ld_length (float): Ld length
+
+        Returns:
+            Dict[Tuple[float], List[IncreasedLength]]: increased lengths by the lengths of the stack
+        """
+        results = {}
+        groups = {} # key: number of pieces, value: list of profiles
+        for lengths in dict.fromkeys(profiles):
+            if len(lengths) > CHAIN_THRESHOLD:
+                results[lengths] = cls(lengths, d_length, ld_length).get_results()
+            elif len(lengths) > 0:
+                groups.setdefault(len(lengths), []).append(lengths)
+        for group in groups.values():
+            values, refs, is_ld = cls._fill_tables(np.asarray(group, dtype=np.float64), d_length, ld_length)
+            for b, lengths in enumerate(group):
+                sm = cls(lengths, d_length, ld_length, method="batch")
+                sm._set_tables(values[b], refs[b], is_ld[b])
+                sm._retrieve_selected_lengths()
+                results[lengths] = sm.get_results()
+        return results
+
+    def _run_chain(self) -> bool:
+        """finds the minimum total length of the table in O(n^2).
+        the costs do not depend on the number of selected lengths, so only the best value of each column is kept.
+        if the best value of every column is clearly less than the others, the best path is the one that the table
+        selects and its total is summed in the same order, so the results are the same as the table.
+        otherwise the order of the close values may depend on the rounding errors and the chain does not decide it.
+
+        Returns:
+            bool: False if two values of a column are closer than CHAIN_TOLERANCE, the results are not set.
+        """
+        lengths = np.asarray(self.lengths, dtype=np.float64)
+        n = len(lengths)
+        costs, ld_dominations = self._get_costs(lengths, self.d_length, self.ld_length)
+        values = np.maximum(self.ld_length, lengths+self.d_length) * (np.arange(n)+1) # only one selected length
+        refs = np.full(n, -1, dtype=np.int64)
+        is_ld = self.ld_length > lengths+self.d_length
+        for j in range(1, n):
+            sums = values[:j] + costs[:j, j]
+            k = int(np.argmin(sums))
+            max_value = min(sums[k], values[j]) * (1 + CHAIN_TOLERANCE) # values are positive
+            if np.count_nonzero(sums <= max_value) + (values[j] <= max_value) > 1:
+                return False
+            if values[j] < sums[k]:
+                continue
+            values[j] = sums[k]
+            refs[j] = k
+            is_ld[j] = ld_dominations[k][j]
+        self._value = values[-1]
+        selected_lengths = []
+        col_index = n-1
+        while col_index >= 0:
+            domination = DominationType.LD if is_ld[col_index] else DominationType.D
+            selected_lengths.append(self.SelectedLength(index=col_index, domination=domination))
+            col_index = int(refs[col_index])
+        self._selected_lengths = selected_lengths
+        return True
+
+    def _get_domination(self, row_index: int, col_index: int) -> DominationType:
+        return DominationType.LD if self._is_ld[row_index][col_index] else DominationType.D
+
     def _retrieve_selected_lengths(self) -> None:
         """returns the list of indices that results in the minimum total length
         and the domination status of each one
         """
-        min_value = float("inf")
-        min_index = None
-        for i in range(len(self.lengths)):
-            if self._container[i][len(self.lengths)-1].value < min_value:
-                min_value = self._container[i][len(self.lengths)-1].value
-                min_index = i
-        
-        row_index = min_index
+        row_index = int(np.argmin(self._values[:, -1]))
+        self._value = self._values[row_index][-1]
         col_index = len(self.lengths)-1
         selected_lengths = []
         while (row_index >= 0):
-            selected_length = self.SelectedLength(index=col_index, domination=self._container[row_index][col_index].domination)
+            selected_length = self.SelectedLength(index=col_index, domination=self._get_domination(row_index, col_index))
             selected_lengths.append(selected_length)
-            col_index = self._container[row_index][col_index].ref
+            col_index = int(self._refs[row_index][col_index])
             row_index -= 1
         self._selected_lengths = selected_lengths
     
@@ -163,26 +254,58 @@ class PieceDomination():
 
 
 class PracticalOptimization():
-    def __init__(self, stack: Stack, d_length: float, ld_length: float):
+    def __init__(self, stack: Stack, d_length: float, ld_length: float, cache: Dict[tuple, List[IncreasedLength]] = None):
+        """sets the practical periods of the pieces of the stack.
+
+        Args:
+            stack (Stack): stack of the pieces
+            d_length (float): efficient depth of foundation
+            ld_length (float): Ld length
+            cache (Dict[tuple, List[IncreasedLength]], optional): increased lengths by the lengths of a side,
+                it can be shared between the stacks with the same d and Ld. Defaults to None.
+        """
         self.stack = stack
         self.d_length = d_length
         self.ld_length = ld_length
+        self.cache = {} if cache is None else cache
         self._run()
 
-    def _extract_lengths(self, side: str) -> List[float]:
+    @classmethod
+    def run_batch(cls, stacks: List[Stack], d_length: float, ld_length: float) -> None:
+        """sets the practical periods of the pieces of all the stacks.
+        both sides of all the stacks are optimized together by StackMinimization.get_batch_results.
+
+        Args:
+            stacks (List[Stack]): stacks of the pieces
+            d_length (float): efficient depth of foundation
+            ld_length (float): Ld length
+        """
+        profiles = [
+            tuple(cls.get_lengths(stack, side)) for stack in stacks for side in ("start", "end")
+        ]
+        cache = StackMinimization.get_batch_results(profiles, d_length, ld_length)
+        for stack in stacks:
+            cls(stack, d_length, ld_length, cache=cache)
+
+    @staticmethod
+    def get_lengths(stack: Stack, side: str) -> List[float]:
         """extracts list of lengths for each side of the stack
 
         Args:
+            stack (Stack): the stack
             side (str): it could be "start" or "end"
 
         Returns:
             List[float]: list of lengths in ascending order
         """
         lengths = []
-        for piece in self.stack.get_pieces():
-            lengths.append(abs(self.stack.peak_station - getattr(piece.theoretical,side)))
+        for piece in stack.get_pieces():
+            lengths.append(abs(stack.peak_station - getattr(piece.theoretical,side)))
         return lengths
 
+    def _extract_lengths(self, side: str) -> List[float]:
+        return self.get_lengths(self.stack, side)
+
     def _initialize_practical(self) -> None:
         """initializes practical period and domination for each piece of stack
         """
@@ -220,9 +343,11 @@ class PracticalOptimization():
         Args:
             side ([type]): [description]
         """
-        lengths = self._extract_lengths(side)
-        optimization = StackMinimization(lengths=lengths, d_length=self.d_length, ld_length=self.ld_length)
-        increased_lengths = optimization.get_results()
+        lengths = tuple(self._extract_lengths(side))
+        if lengths not in self.cache:
+            optimization = StackMinimization(lengths=lengths, d_length=self.d_length, ld_length=self.ld_length)
+            self.cache[lengths] = optimization.get_results()
+        increased_lengths = self.cache[lengths]
         self._set_practical(side=side, increased_lengths=increased_lengths)
     
     def _run(self) -> None:
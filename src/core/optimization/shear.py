@@ -3,6 +3,7 @@ from core.src.components.shear import ShearZone, ShearType
 from core.src.components.rebar import Rebar
 from typing import List
 import math
+import numpy as np
 from core.setting import MIN_SHEAR_INTERVAL
 
 class ShearOptimization():
@@ -19,7 +20,8 @@ class ShearOptimization():
         self._steel_densities = sorted(list(set([shear_zone.steel_density for shear_zone in self._shear_zones])))
         self._max_interval = max_interval
         self._rebar = rebar
-        self._container = None
+        self._values = None
+        self._refs = None
         self._number_of_types = number_of_types
     
     def run(self):
@@ -31,62 +33,35 @@ class ShearOptimization():
         self._shear_types = shear_types
         self._set_shear_types(shear_types)
     
-    class Pair():
-        def __init__(self) -> None:
-            self.ref = None
-            self.value = None
-        def __eq__(self, other: object) -> bool:
-            return all((
-                self.value == other.value,
-                self.ref == other.ref
-            ))
-        def __str__(self):
-            return (f"Pair: [value: {self.value}, ref: {self.ref}]")
-    
     def _run(self, number_of_types: int) -> None:
-        """filles the container of dynamic programming that will be used for finding the optimum point.
+        """filles the tables of dynamic programming that will be used for finding the optimum point.
+        values[i][j] is the minimum steel of the zones not denser than steel_densities[j] using i+1 types
+        and refs[i][j] is the index of the previous selected density, -1 if there is not.
+        the zones are sorted by density, so the steel of the zones between two densities is found by
+        the cumulative length of the zones.
 
         Args:
             number_of_types (int): number of types that is allowed for shear
         """
-        steel_densities = self._steel_densities
-        # initialize container
-        container = []
-        self._container = container
-        for i in range(number_of_types):
-            row = []
-            container.append(row)
-            for j in range(len(steel_densities)):
-                if j < i:
-                    row.append(None)
-                else:
-                    row.append(self.Pair())
-        
-        # calculate container cells
-        for i in range(number_of_types):
-            if i == 0:
-                for j in range(i, len(steel_densities)):
-                    sum = 0
-                    for shear_zone in self._shear_zones:
-                        if shear_zone.steel_density <= steel_densities[j]:
-                            sum += steel_densities[j] * shear_zone.period.get_length()
-                        else:
-                            break
-                    container[i][j].value = sum
-            else:
-                for j in range(i, len(steel_densities)):
-                    min_sum = float("inf")
-                    min_ref = None
-                    for k in range(i-1, j):
-                        sum = container[i-1][k].value
-                        for shear_zone in self._shear_zones:
-                            if steel_densities[k] < shear_zone.steel_density <= steel_densities[j]:
-                                sum += steel_densities[j] * shear_zone.period.get_length()
-                        if sum < min_sum:
-                            min_ref = k
-                            min_sum = sum
-                    container[i][j].value = min_sum
-                    container[i][j].ref = min_ref
+        steel_densities = np.asarray(self._steel_densities, dtype=np.float64)
+        n = len(steel_densities)
+        # total length of the zones not denser than each density
+        zone_densities = np.asarray([shear_zone.steel_density for shear_zone in self._shear_zones], dtype=np.float64)
+        zone_lengths = np.asarray([shear_zone.period.get_length() for shear_zone in self._shear_zones], dtype=np.float64)
+        zone_counts = np.searchsorted(zone_densities, steel_densities, side="right")
+        lengths = np.concatenate(([0], np.cumsum(zone_lengths)))[zone_counts]
+
+        values = np.full((number_of_types, n), np.inf)
+        refs = np.full((number_of_types, n), -1, dtype=np.int64)
+        values[0] = steel_densities * lengths
+        for i in range(1, number_of_types):
+            for j in range(i, n):
+                sums = values[i-1][i-1:j] + steel_densities[j] * (lengths[j] - lengths[i-1:j])
+                index = int(np.argmin(sums))
+                values[i][j] = sums[index]
+                refs[i][j] = i-1 + index
+        self._values = values
+        self._refs = refs
         
     def _get_selected_densities(self, number_of_types: int) -> List[float]:
         """finds the best chosen points from the available densities.
@@ -97,14 +72,13 @@ class ShearOptimization():
         Returns:
             List[float]: returns the chosen densities.
         """
-        container = self._container
         steel_densities = self._steel_densities
         row_index = min(number_of_types-1, len(steel_densities)-1)
         col_index = len(steel_densities)-1
         selected_densities = []
         while (row_index >= 0):
             selected_densities.append(steel_densities[col_index])
-            col_index = container[row_index][col_index].ref
+            col_index = self._refs[row_index][col_index]
             row_index -= 1
         return sorted(selected_densities)
     
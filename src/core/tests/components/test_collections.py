@@ -85,6 +85,16 @@ class TestContainer():
         assert len(stacks[0].get_pieces()) == 5 and stacks[0].peak_station == 4
         assert len(stacks[1].get_pieces()) == 4 and stacks[1].peak_station == 9
     
+    def test_get_stacks_cache(self, container_bunched):
+        stacks = container_bunched.get_stacks("executive")
+        assert container_bunched.get_stacks("executive") is stacks
+        # mutating a period rebuilds the stacks
+        piece = container_bunched.get_rows()[6][0]
+        piece.executive.end = 5
+        stacks = container_bunched.get_stacks("executive")
+        assert container_bunched.get_stacks("executive") is stacks
+        assert [len(stack) for stack in stacks] == [5, 6, 4, 3]
+
     def test_drawing_data(self, container_bunched):
         rows = container_bunched.get_drawing_data()
         checks = (
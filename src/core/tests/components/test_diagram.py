@@ -1,5 +1,6 @@
 import pytest
-from optibar_core.src.components.diagram import Diagram, Point
+import numpy as np
+from optibar_core.src.components.diagram import Diagram, Point, RangeIndex
 from optibar_core.src.components.period import Period
 
 @pytest.fixture(scope="class")
@@ -164,15 +165,96 @@ class TestEffective():
         assert diagram.get_stations() == [0,1,2,3,5,6,10]
         assert diagram.get_values() == [3,3,4,4,2,4,4]
 
+    def test_increase_areas(self):
+        diagram = Diagram([0,10], [0,0])
+        diagram.increase_areas([
+            ({"start":False, "end":False}, [1,2,5,6], 1),
+            ({"start":True, "end":False}, [3,5], 2),
+            ({"start":False, "end":True}, [5,6], 3),
+            ({"start":True, "end":True}, [], 1),
+            ({"start":False, "end":False}, [7,8,11,12], 1),
+        ])
+        assert diagram.get_stations() == [0,1,2,3,5,6,7,8,10]
+        assert diagram.get_values() == pytest.approx([3,3,4,4,2,4,4,5,5])
+
 class TestTrimPeriod():
     def test_trim_period(self, diagram):
         diagram.trim_period(Period(3.2, 5.3))
         assert diagram.get_stations() == [0,1,2,3,3.2,3.221,5.279,5.3,6,7,8,9]
         assert diagram.get_values() == [3,0,0,0,1.0000000000000009, 0,0,0.08737864077669863,3,1,0,4]
 
+    def test_trim_existing_stations(self):
+        diagram = Diagram([0, 1, 2, 99, 100], [2, 3, 4, 5, 6])
+        diagram.trim_period(Period(0, 100))
+        assert diagram.get_stations() == [0, 1, 99, 100]
+        assert diagram.get_values() == [2, 3, 5, 6]
+
+class TestMinimizePeriod():
+    def test_minimize_period(self):
+        diagram = Diagram([0, 1, 2, 3, 4], [5, 1, 4, 6, 2])
+        diagram.minimize_period(Period(1, 3), side="start")
+        assert diagram.get_values() == [5, 1, 4, 6, 2]
+
+    def test_interpolated_side(self):
+        diagram = Diagram([0, 1, 2, 3, 4], [5, 1, 4, 6, 2])
+        diagram.minimize_period(Period(2.5, 4), side="start")
+        assert diagram.get_stations() == [0, 1, 2, 3, 4]
+        assert diagram.get_values() == [5, 1, 4, 6, 2]
+
 class TestLinearizePeriod():
     def test_linearize_period(self, diagram):
         diagram.linearize_period(Period(2,5.5))
         assert diagram.get_stations() == [0, 1, 2, 5.5, 6, 7, 8, 9]
         assert diagram.get_values() == [3, 0, 0, 3.5, 3, 1, 0, 4]
 
+
+class TestInsertAdditionalRows():
+    def test_insert_additional_rows(self):
+        stations = list(range(10))
+        areas = [3, 0, 0, 0, 5, 4, 3, 1, 0, 4]
+        looped = Diagram(stations, areas)
+        rows = []
+        while looped.is_positive():
+            rows.append(looped.insert_additional(1))
+        diagram = Diagram(stations, areas)
+        assert diagram.insert_additional_rows(1) == rows
+        assert diagram.get_stations() == looped.get_stations()
+        assert diagram.get_values() == looped.get_values()
+
+    def test_touching_level(self):
+        diagram = Diagram([0, 1, 2], [2, 1, 2])
+        rows = diagram.insert_additional_rows(1)
+        assert rows == [[Period(0,2)], [Period(0,2)]]
+
+    def test_float_diagrams(self):
+        # Period equality is rounded, so the stations are compared exactly
+        def get_stations(rows):
+            return [[(period.start, period.end) for period in row] for row in rows]
+
+        rng = np.random.default_rng(0)
+        for _ in range(200):
+            stations = np.unique(np.round(rng.uniform(0, 40, rng.integers(2, 40)), 3)).tolist()
+            areas = np.where(rng.random(len(stations)) < 0.2, 0, rng.uniform(0, 0.006, len(stations))).tolist()
+            area = float(rng.choice([0.000314, 0.000491, 0.001]))
+            looped = Diagram(stations, areas)
+            rows = []
+            while looped.is_positive():
+                rows.append(looped.insert_additional(area))
+            diagram = Diagram(stations, areas)
+            assert get_stations(diagram.insert_additional_rows(area)) == get_stations(rows)
+            assert diagram.get_stations() == looped.get_stations()
+            assert diagram.get_values() == looped.get_values()
+
+class TestRangeIndex():
+    def test_query(self):
+        values = np.array([3, 0, 0, 0, 5, 4, 3, 1, 0, 4, 5], dtype=np.float64)
+        max_index = RangeIndex(values, "max")
+        min_index = RangeIndex(values, "min")
+        for start in range(len(values)):
+            for end in range(start+1, len(values)+1):
+                assert max_index.query(start, end) == start + int(np.argmax(values[start:end]))
+                assert min_index.query(start, end) == start + int(np.argmin(values[start:end]))
+
+    def test_min_point(self, diagram):
+        assert diagram.get_min_point(Period(3.5,8.5)) == Point(8,0)
+        assert diagram.get_min_point(Period(4.5,7)) == Point(7,1)
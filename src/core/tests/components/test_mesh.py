@@ -5,6 +5,8 @@ from optibar_core.src.components.period import Period
 from optibar_core.src.components.piece import Piece, Bend
 from optibar_core.src.optimization.practical import DominationType, PieceDomination
 
+import numpy as np
+import pickle
 import warnings
 
 @pytest.fixture
@@ -474,5 +476,97 @@ class TestEffectiveDiagram():
         # print(diagram)
         # assert False
 
+    def test_resistance_moments_batch(self):
+        areas = np.array([0.001, 0.004, 0.2, 0.003])
+        widths = np.array([1, 0, 1, 1.5])
+        top = Mesh.get_resistance_moments(areas[:2], widths[:2], 0.8, 40000, 3000)
+        bottom = Mesh.get_resistance_moments(areas[2:], widths[2:], 0.9, 40000, 250)
+        moments = Mesh.get_resistance_moments(areas, widths, np.array([0.8, 0.8, 0.9, 0.9]), 40000, np.array([3000, 3000, 250, 250]))
+        assert list(moments) == list(top) + list(bottom)
+        assert all(moments > 0)
+
+        
         
-        
\ No newline at end of file
+class TestRefresh():
+    @staticmethod
+    def full_process(mesh: Mesh) -> None:
+        """refreshes all the pieces and processes all the stacks on every unification."""
+        mesh._refresh()
+        while True:
+            while True:
+                mesh._set_practical()
+                if mesh._unify(by="practical"):
+                    mesh._refresh()
+                else:
+                    break
+            mesh._bend_stack_base()
+            mesh._set_upper_bound()
+            mesh._round()
+            mesh._set_executive(by="practical")
+            if mesh._unify(by="executive"):
+                mesh._refresh()
+            else:
+                break
+
+    @staticmethod
+    def get_periods(mesh: Mesh):
+        return [
+            [
+                (piece.theoretical.start, piece.theoretical.end, piece.practical.start, piece.practical.end,
+                 piece.executive.start, piece.executive.end, piece.bend.start, piece.bend.end, piece.shortest_piece_length)
+                for piece in row
+            ]
+            for row in mesh.container.get_rows()
+        ]
+
+    def test_refresh_equals_full_process(self, mesh, rebar):
+        mesh.set_side_cover(0.075)
+        mesh.set_typical_rebar(rebar, rebar, {"method": "MIN_RATIO", "value": None})
+        mesh.set_additional_rebar(rebar, 0.1)
+        for _ in range(2):
+            full_mesh = pickle.loads(pickle.dumps(mesh))
+            mesh.refresh()
+            self.full_process(full_mesh)
+            assert self.get_periods(mesh) == self.get_periods(full_mesh)
+            # the reduced length types move the periods of the pieces
+            for piece in mesh.get_additional_pieces():
+                if piece.shortest_piece_length + .5 <= piece.length_upper_bound:
+                    piece.shortest_piece_length += .5
+            mesh.adjust_reduced_type_lengths()
+
+    def test_refresh_keeps_results(self, mesh, rebar):
+        mesh.set_side_cover(0.075)
+        mesh.set_typical_rebar(rebar, rebar, {"method": "MIN_RATIO", "value": None})
+        mesh.set_additional_rebar(rebar, 0.1)
+        full_mesh = pickle.loads(pickle.dumps(mesh))
+        self.full_process(full_mesh)
+        for piece in mesh.get_additional_pieces():
+            piece.shortest_piece_length += 1
+            piece.executive = Period(0, 1)
+        mesh.refresh()
+        assert self.get_periods(mesh) == self.get_periods(full_mesh)
+
+    def test_changed_pieces(self, mesh, rebar):
+        mesh.set_side_cover(0.075)
+        mesh.set_typical_rebar(rebar, rebar, {"method": "MIN_RATIO", "value": None})
+        mesh.set_additional_rebar(rebar, 0.1)
+        assert mesh._get_changed_pieces("theoretical") == set()
+        row = mesh.container.get_rows()[-1]
+        piece = Piece(rebar, Period(row[0].theoretical.start, row[0].theoretical.end))
+        row[0] = piece
+        assert id(piece) in mesh._get_changed_pieces("theoretical")
+
+    def test_pickled_refresh(self, mesh, rebar):
+        mesh.set_side_cover(0.075)
+        mesh.set_typical_rebar(rebar, rebar, {"method": "MIN_RATIO", "value": None})
+        mesh.set_additional_rebar(rebar, 0.1)
+        full_mesh = pickle.loads(pickle.dumps(mesh))
+        self.full_process(full_mesh)
+        moved_pieces = len(mesh._get_moved_pieces())
+        mesh = pickle.loads(pickle.dumps(mesh))
+        assert mesh._get_changed_pieces("theoretical") == set()
+        assert len(mesh._get_moved_pieces()) == moved_pieces
+        for piece in mesh.get_additional_pieces():
+            piece.executive = Period(0, 1)
+        mesh.refresh()
+        assert self.get_periods(mesh) == self.get_periods(full_mesh)
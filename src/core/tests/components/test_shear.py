@@ -54,3 +54,19 @@ class TestShearOptimization():
             sorted_shear_zones[3].shear_type.id == 2,
         ))
 
+
+    def test_selected_densities(self, rebar, shear_zone_factory):
+        shear_zones = [
+            shear_zone_factory(0,1,3),
+            shear_zone_factory(0,2,1),
+            shear_zone_factory(0,1,3),
+            shear_zone_factory(0,4,2),
+            shear_zone_factory(0,1,1),
+        ]
+        so = ShearOptimization(rebar, .4, shear_zones, 2)
+        so._run(2)
+        assert so._values[0].tolist() == [3, 14, 27]
+        assert so._get_selected_densities(1) == [3]
+        # 2 * (3 + 4) + 3 * 2 = 20 is less than 1 * 3 + 3 * (4 + 2) = 21
+        assert so._values[1][2] == 20
+        assert so._get_selected_densities(2) == [2, 3]
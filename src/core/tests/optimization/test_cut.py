@@ -0,0 +1,53 @@
+import pytest
+import itertools
+from optibar_core.src.optimization.cut import CuttingStock, get_knapsack
+
+def get_cut_numbers(lengths, results):
+    cut_numbers = [0] * len(lengths)
+    for pattern, number in zip(results['patterns'], results['numbers']):
+        assert sum(length * n for length, n in zip(lengths, pattern)) <= 12
+        for i in range(len(lengths)):
+            cut_numbers[i] += pattern[i] * number
+    return cut_numbers
+
+class TestKnapsack():
+    def test_brute_force(self):
+        weights = [3, 5, 7, 11]
+        values = [1.2, 2.1, 3.0, -1]
+        bounds = [3, 2, 1, 2]
+        pattern = get_knapsack(weights, values, bounds, 20)
+        assert pattern == [1, 2, 1, 0]
+        best = max(
+            sum(v * x for v, x in zip(values, numbers))
+            for numbers in itertools.product(*[range(b + 1) for b in bounds])
+            if sum(w * x for w, x in zip(weights, numbers)) <= 20
+        )
+        assert sum(v * x for v, x in zip(values, pattern)) == pytest.approx(best)
+
+class TestCuttingStock():
+    def test_validation(self):
+        with pytest.raises(ValueError):
+            CuttingStock([2, 3], [1])
+        with pytest.raises(ValueError):
+            CuttingStock([12.5], [1])
+        with pytest.raises(ValueError):
+            CuttingStock([0], [1])
+        with pytest.raises(ValueError):
+            CuttingStock([2], [-1])
+
+    def test_numbers(self):
+        lengths = [2.5,3.4,8,3.9,4.3,2.9,7.2]
+        numbers = [20,40,34,25,12,30,20]
+        cutting_stock = CuttingStock(lengths, numbers)
+        assert get_cut_numbers(lengths, cutting_stock.get_results()) == numbers
+        # the bound of the linear relaxation is 72.5
+        assert cutting_stock.get_stock_number() == 73
+
+    def test_exact_fit(self):
+        cutting_stock = CuttingStock([4, 6, 12], [3, 4, 2])
+        assert get_cut_numbers([4, 6, 12], cutting_stock.get_results()) == [3, 4, 2]
+        assert cutting_stock.get_stock_number() == 5
+
+    def test_empty(self):
+        assert CuttingStock([], []).get_results() == {'patterns': [], 'numbers': []}
+        assert CuttingStock([3], [0]).get_stock_number() == 0
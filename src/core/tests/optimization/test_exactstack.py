@@ -0,0 +1,139 @@
+import pytest
+import pickle
+import random
+from concurrent.futures import ProcessPoolExecutor
+from optibar_core.src.optimization.executive.exactstack import Minimization, Assignment, StackAlgorithmExact, BatchMinimization
+from optibar_core.src.components.collections import Stack
+
+@pytest.fixture
+def minimization() -> Minimization:
+    return Minimization(
+        selected_length= [3, 5, 8, 12],
+        lengths= [2.5, 3, 4.5, 7, 7.5, 11],
+        upper_bounds= [12, 12, 12, 12, 12, 12],
+        num_pieces= [1, 1, 1, 1, 1, 1]
+    )
+
+class TestMinimization():
+    def test_all_types(self, minimization):
+        assert minimization.run(4) == 'optimal'
+        assert minimization.get_results() == [3, 3, 5, 8, 8, 12]
+
+    def test_infeasible(self, minimization):
+        assert minimization.run(1) == 'optimal'
+        assert minimization.run(0) == 'infeasible'
+
+    def test_retry(self, minimization):
+        assert minimization.run(2) == 'optimal'
+        assert minimization.get_results() == [5, 5, 5, 12, 12, 12]
+        assert minimization.run(3) == 'optimal'
+        assert minimization.get_results() == [3, 3, 8, 8, 8, 12]
+
+    def test_num_pieces(self):
+        minimization = Minimization([5, 8], [4, 4], [12, 12], [1, 2])
+        assert minimization.run(1) == 'infeasible'
+        assert minimization.run(2) == 'optimal'
+        assert minimization.get_results() == [5, 5]
+
+    def test_min_feasible_p(self, minimization):
+        assert minimization.get_min_feasible_p() == 1
+        assert Minimization([5, 8], [4, 4, 7], [12, 12, 12], [1, 2, 3]).get_min_feasible_p() == 3
+        assert Minimization([5, 8], [4, 9], [12, 12], [1, 1]).get_min_feasible_p() is None
+
+class TestBatchMinimization():
+    def test_blocks(self):
+        args_list = [
+            ([3, 5, 8, 12], [2.5, 3, 4.5, 7, 7.5, 11], [12] * 6, [1] * 6),
+            ([5, 8], [4, 4, 7], [12] * 3, [1, 2, 2]),
+            ([3, 5, 8, 12], [2.5, 3, 4.5, 7, 7.5, 11], [12] * 6, [1] * 6),
+        ]
+        batch = BatchMinimization([Minimization(*args) for args in args_list])
+        assert batch.run([2, 3, 3]) == 'optimal'
+        assert batch.get_results() == [[5, 5, 5, 12, 12, 12], [5, 5, 8], [3, 3, 8, 8, 8, 12]]
+
+    def test_optimal_blocks(self):
+        rng = random.Random(0)
+        args_list = []
+        for _ in range(40):
+            lengths = sorted(rng.choice(range(10, 115, 5)) / 10 for _ in range(rng.randint(3, 12)))
+            args_list.append(([3, 5, 6.5, 8, 10, 12], lengths, [12] * len(lengths), [1] * len(lengths)))
+        batch = BatchMinimization([Minimization(*args) for args in args_list])
+        assert batch.run([2] * len(args_list)) == 'optimal'
+        for args, results in zip(args_list, batch.get_results()):
+            assignment = Assignment(*args)
+            assert assignment.run(2) == 'optimal'
+            # each block is as short as its own optimum
+            assert sum(results) == pytest.approx(sum(assignment.get_results()))
+
+    def test_solve_batch(self):
+        signatures = [
+            ([3, 5, 8, 12], (2.5, 3, 4.5, 7, 7.5, 11), (12,) * 6, (1, 1, 2, 1, 2, 1), 1, "batch"),
+            ([5, 8], (4, 7), (12, 12), (1, 1), 2, "batch"),
+        ]
+        assert StackAlgorithmExact.solve_batch(signatures) == \
+            [(2, [12, 12, 8, 12, 8, 12]), (2, [5, 8])]
+
+class TestAssignment():
+    @pytest.fixture
+    def assignment(self) -> Assignment:
+        return Assignment(
+            selected_length= [3, 5, 8, 12],
+            lengths= [2.5, 3, 4.5, 7, 7.5, 11],
+            upper_bounds= [12, 12, 12, 12, 12, 12],
+            num_pieces= [1, 1, 1, 1, 1, 1]
+        )
+
+    def test_all_budgets(self, assignment):
+        assert assignment.get_costs() == {1: 36.5, 2: 15.5, 3: 6.5, 4: 3.5}
+        assert assignment.run(0) == 'infeasible'
+        assert assignment.run(2) == 'optimal'
+        assert assignment.get_results() == [5, 5, 5, 12, 12, 12]
+        assert assignment.run(3) == 'optimal'
+        assert assignment.get_results() == [3, 3, 8, 8, 8, 12]
+        assert assignment.run(10) == 'optimal'
+        assert assignment.get_results() == [3, 3, 5, 8, 8, 12]
+
+    def test_num_pieces(self):
+        assignment = Assignment([5, 8], [4, 4, 7], [12, 12, 12], [1, 2, 2])
+        assert assignment.run(1) == 'infeasible'
+        assert assignment.run(2) == 'optimal'
+        assert assignment.get_results() == [5, 8, 8]
+        assert assignment.run(3) == 'optimal'
+        assert assignment.get_results() == [5, 5, 8]
+
+    def test_same_as_minimization(self):
+        args = ([3, 4.5, 6, 9, 12], [1, 2.5, 4, 4.5, 5, 8.5, 9, 11.5], [12] * 8, [1, 2, 1, 2, 1, 1, 2, 1])
+        assignment = Assignment(*args)
+        minimization = Minimization(*args)
+        for p in range(2, 7):
+            assert assignment.run(p) == minimization.run(p) == 'optimal'
+            assert sum(assignment.get_results()) <= sum(minimization.get_results())
+
+class TestStackAlgorithmExact():
+    def test_solve_in_executor(self):
+        args = ([3, 5, 8, 12], (2.5, 3, 4.5, 7, 7.5, 11), (12,) * 6, (1, 1, 2, 1, 2, 1), 2)
+        solve = pickle.loads(pickle.dumps(StackAlgorithmExact.solve))
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            assert executor.submit(solve, *args).result() == StackAlgorithmExact.solve(*args) == \
+                (2, [12, 12, 8, 12, 8, 12])
+
+    def test_signature(self, piece_practical_factory):
+        def get_stack(bounds):
+            stack = Stack(5)
+            for start, end in bounds:
+                piece = piece_practical_factory(start, end, 12)
+                piece.executive = piece.practical
+                stack.add_piece(piece)
+            return stack
+        stack_one = get_stack([(0, 7), (1, 4), (0, 11)])
+        stack_two = get_stack([(0, 11), (0, 7), (1, 4)])
+        sa_one = StackAlgorithmExact(stack_one, [3, 8, 12], 2)
+        sa_two = StackAlgorithmExact(stack_two, [3, 8, 12], 2)
+        signature, order = sa_one.get_signature()
+        assert sa_two.get_signature()[0] == signature
+        assert order == [1, 0, 2]
+        p, new_lengths = StackAlgorithmExact.solve(*signature)
+        sa_one.set_lengths(new_lengths, order)
+        assert sa_two.run() == p
+        assert [piece.shortest_piece_length for piece in stack_one.get_pieces()] == [12, 3, 12]
+        assert [piece.shortest_piece_length for piece in stack_two.get_pieces()] == [12, 12, 3]
@@ -1,4 +1,6 @@
 import pytest
+import copy
+import numpy as np
 from optibar_core.src.components.collections import Stack
 from optibar_core.src.components.period import Period
 from optibar_core.src.optimization.practical import (
@@ -13,13 +15,25 @@ from optibar_core.src.optimization.practical import (
 @pytest.fixture
 def pair_factory(rebar):
     def _factory(value, ref, domination):
-        pair = StackMinimization.Pair()
-        pair.value = value
-        pair.ref = ref
-        pair.domination = domination
-        return pair
+        return (round(value,3), ref, domination)
     return _factory
 
+def get_container(sm: StackMinimization):
+    """(value, ref, domination) of the cells of the tables, None for the cells below the diagonal
+    """
+    n = len(sm.lengths)
+    return [
+        [
+            None if j < i else (
+                round(sm._values[i][j],3),
+                None if sm._refs[i][j] == -1 else sm._refs[i][j],
+                sm._get_domination(i, j)
+            )
+            for j in range(n)
+        ]
+        for i in range(n)
+    ]
+
 @pytest.fixture
 def stack(piece_theoretical_factory):
     stack = Stack(0)
@@ -29,25 +43,6 @@ def stack(piece_theoretical_factory):
     return stack
 
 class TestHelperClasses():
-    def test_pair(self):
-        pair_1 = StackMinimization.Pair()
-        pair_1.domination = DominationType.D
-        pair_1.value = 10
-        pair_1.ref = 2
-
-        pair_2 = StackMinimization.Pair()
-        pair_2.domination = DominationType.D
-        pair_2.value = 10
-        pair_2.ref = 2
-
-        pair_3 = StackMinimization.Pair()
-        pair_3.domination = DominationType.LD
-        pair_3.value = 11
-        pair_3.ref = 2
-        assert all((
-            pair_1 == pair_2,
-            pair_1 != pair_3
-        ))
     def test_selected_length(self):
         selected_length_1 = StackMinimization.SelectedLength(10, DominationType.D)
         selected_length_2 = StackMinimization.SelectedLength(10, DominationType.D)
@@ -94,13 +89,7 @@ class TestStackMinimization():
                 pair_factory(6.7,1,DominationType.LD)
             ]
         ]
-        equality = True
-        for i,row in enumerate(sm._container):
-            for j,pair in enumerate(row):
-                if container[i][j] != pair:
-                    equality = False
-                    break
-        assert equality
+        assert get_container(sm) == container
     
     def test_selected_length(self):
         sm = StackMinimization(lengths=[1,1.5,2], d_length=.3, ld_length=1.4)
@@ -122,7 +111,61 @@ class TestStackMinimization():
 
 
 
+    def test_chain(self):
+        sm = StackMinimization(lengths=[1,1.5,2], d_length=.3, ld_length=1.4, method="chain")
+        assert sm._selected_lengths == [
+            StackMinimization.SelectedLength(2,DominationType.LD),
+            StackMinimization.SelectedLength(0,DominationType.LD),
+        ]
+        assert not hasattr(sm, "_values")
+
+    def test_chain_tie(self):
+        # equal lengths make equal totals, the table decides them
+        sm = StackMinimization(lengths=[1,1,1], d_length=1.4, ld_length=.3, method="chain")
+        assert hasattr(sm, "_values")
+        assert sm._selected_lengths == StackMinimization(lengths=[1,1,1], d_length=1.4, ld_length=.3, method="table")._selected_lengths
+
+    def test_verify(self):
+        lengths = [0.1 * i + 0.05 * (i % 3) for i in range(40)]
+        for d_length, ld_length in ((.3, 1.4), (.8, .8), (1.2, .5)):
+            sm = StackMinimization(lengths=lengths, d_length=d_length, ld_length=ld_length, method="verify")
+            assert sm._value == sm._values[:, -1].min()
+            assert StackMinimization(lengths=lengths, d_length=d_length, ld_length=ld_length).get_results() == sm.get_results()
+
+    def test_chain_results(self):
+        # IncreasedLength equality is rounded, so the additions are compared exactly
+        def get_results(sm):
+            return [(increased_length.addition, increased_length.domination) for increased_length in sm.get_results()]
+
+        rng = np.random.default_rng(0)
+        for _ in range(200):
+            lengths = np.sort(np.round(rng.uniform(0.1, 8, rng.integers(17, 50)), 3)).tolist()
+            d_length, ld_length = rng.uniform(0.3, 1.5, 2)
+            chain = StackMinimization(lengths=lengths, d_length=d_length, ld_length=ld_length)
+            table = StackMinimization(lengths=lengths, d_length=d_length, ld_length=ld_length, method="table")
+            assert chain._value == table._value
+            assert get_results(chain) == get_results(table)
+
+    def test_batch_results(self):
+        profiles = [(1,1.5,2), (0.5,2,2.5), (1,1.5,2), (3,), tuple(0.2 * i for i in range(20))]
+        results = StackMinimization.get_batch_results(profiles, d_length=.3, ld_length=1.4)
+        assert len(results) == 4
+        for lengths in profiles:
+            assert results[lengths] == StackMinimization(lengths=lengths, d_length=.3, ld_length=1.4).get_results()
+
 class TestPracticalOptimization():
+    def test_cache(self, stack, piece_theoretical_factory):
+        other_stack = Stack(10)
+        other_stack.add_piece(piece_theoretical_factory(8,11))
+        other_stack.add_piece(piece_theoretical_factory(7,11.5))
+        other_stack.add_piece(piece_theoretical_factory(6.5,12))
+        cache = {}
+        PracticalOptimization(stack=stack, d_length=0.3, ld_length=1.4, cache=cache)
+        PracticalOptimization(stack=other_stack, d_length=0.3, ld_length=1.4, cache=cache)
+        assert list(cache.keys()) == [(2,3,3.5), (1,1.5,2)]
+        assert [round(piece.practical.end - 10, 3) for piece in other_stack.get_pieces()] == \
+            [round(piece.practical.end, 3) for piece in stack.get_pieces()]
+
     def test_extract_lengths(self, stack):
         po = PracticalOptimization(stack=stack, d_length=0.3, ld_length=1.4)
         # for piece in stack.get_pieces():
@@ -141,6 +184,14 @@ class TestPracticalOptimization():
             ]
         )
 
-
-    
-        
\ No newline at end of file
+    def test_run_batch(self, stack, piece_theoretical_factory):
+        other_stack = Stack(10)
+        other_stack.add_piece(piece_theoretical_factory(9,10.5))
+        other_stack.add_piece(piece_theoretical_factory(8,12))
+        PracticalOptimization.run_batch([stack, other_stack], d_length=0.3, ld_length=1.4)
+        practical_periods = [copy.copy(piece.practical) for piece in stack.get_pieces() + other_stack.get_pieces()]
+        for piece in stack.get_pieces() + other_stack.get_pieces():
+            piece.practical = None
+        PracticalOptimization(stack=stack, d_length=0.3, ld_length=1.4)
+        PracticalOptimization(stack=other_stack, d_length=0.3, ld_length=1.4)
+        assert [piece.practical for piece in stack.get_pieces() + other_stack.get_pieces()] == practical_periods
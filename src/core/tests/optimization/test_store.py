@@ -0,0 +1,72 @@
+import pytest
+import sqlite3
+from optibar_core.src.optimization.executive.store import SolutionStore
+from optibar_core.src.optimization.executive.total import TotalAlgorithm
+
+@pytest.fixture
+def store(tmp_path) -> SolutionStore:
+    store = SolutionStore(tmp_path / "solutions.sqlite", max_size=3)
+    yield store
+    store.close()
+
+class TestSolutionStore():
+    def test_get_put(self, store):
+        assert store.get("stack", (1, (2.5, 3))) is None
+        store.put("stack", (1, (2.5, 3)), (2, [3, 3]))
+        assert store.get("stack", (1, (2.5, 3))) == [2, [3, 3]]
+        assert store.get("total", (1, (2.5, 3))) is None
+        assert store.get_stats() == {'hits': 1, 'misses': 2, 'hit_rate': 1/3, 'size': 1}
+        store.put("stack", (1, (2.5, 3)), (1, [3, 3]))
+        assert store.get("stack", (1, (2.5, 3))) == [1, [3, 3]]
+        assert len(store) == 1
+
+    def test_lru_eviction(self, store):
+        store.update("stack", [((i,), i) for i in range(3)])
+        assert store.get("stack", (0,)) == 0
+        store.put("stack", (3,), 3)
+        assert len(store) == 3
+        assert store.get("stack", (1,)) is None
+        assert [store.get("stack", (i,)) for i in (0, 2, 3)] == [0, 2, 3]
+
+    def test_persistence(self, tmp_path):
+        # (lengths, upper bounds, counts, number of types) of TotalAlgorithm
+        key = ((2.5, 4.0, 6.0), (12, 12, 12), (2, 1, 3), 2)
+        with SolutionStore(tmp_path / "solutions.sqlite") as store:
+            store.put("total", key, [4.0, 6.0])
+            store.put("total", key[:3] + (1,), 2) # minimum feasible number of types
+        with SolutionStore(tmp_path / "solutions.sqlite") as store:
+            assert store.get("total", key) == [4.0, 6.0]
+            assert store.get("total", key[:3] + (1,)) == 2
+
+    def test_other_versions(self, tmp_path):
+        path = tmp_path / "solutions.sqlite"
+        SolutionStore(path).close()
+        connection = sqlite3.connect(str(path))
+        # a solution of the earlier versions
+        connection.execute("INSERT INTO solutions VALUES (?, ?, ?, ?)", ("total", repr((1,)), b"\x80\x04K\x02.", 1))
+        connection.commit()
+        connection.close()
+        with SolutionStore(path) as store:
+            assert len(store) == 0
+            assert store.get("total", (1,)) is None
+
+    def test_commit_usage(self, tmp_path):
+        store = SolutionStore(tmp_path / "solutions.sqlite", max_size=2)
+        store.update("stack", [((0,), 0), ((1,), 1)])
+        assert store.get("stack", (0,)) == 0
+        store.commit()
+        # the usage is visible to another connection while the first one is not closed
+        other = SolutionStore(tmp_path / "solutions.sqlite", max_size=2)
+        other.put("stack", (2,), 2)
+        assert other.get("stack", (0,)) == 0
+        assert other.get("stack", (1,)) is None
+        other.close()
+        store.close()
+
+    def test_total_algorithm(self, store, piece_practical_factory):
+        pieces = [piece_practical_factory(0, length, 12) for length in (1, 2, 2, 4, 6)]
+        selected_lengths = TotalAlgorithm(pieces, store= store).get_selected_lengths(3)
+        assert store.get_stats()['hits'] == 0
+        assert TotalAlgorithm(pieces, store= store).get_selected_lengths(3) == selected_lengths
+        assert store.get_stats()['hits'] == 1
+        assert selected_lengths == TotalAlgorithm(pieces).get_selected_lengths(3)
@@ -7,12 +7,18 @@ from optibar_core.src.optimization.executive.errors import NotEnoughTypes
 @pytest.fixture
 def pair_factory():
     def _factory(value, ref):
-        pair = TotalAlgorithm.Pair()
-        pair.value = value
-        pair.ref = ref
-        return pair
+        return (value, ref)
     return _factory
 
+def get_container(ta: TotalAlgorithm):
+    """(value, ref) of the cells of the table, None for the cells below the diagonal
+    """
+    ta._fill(len(ta._lengths))
+    return [
+        [None if j < i else (ta._values[i][j], None if ta._refs[i][j] == -1 else ta._refs[i][j]) for j in range(len(row))]
+        for i, row in enumerate(ta._values)
+    ]
+
 @pytest.fixture
 def pieces(piece_practical_factory):
     pieces = [
@@ -41,22 +47,6 @@ def pieces_no_bound(piece_practical_factory):
     ]
     return pieces
 
-class TestPair():
-    def test_pair_class(self):
-        pair_1 = TotalAlgorithm.Pair()
-        pair_1.value = 10
-        pair_1.ref = 2
-        pair_2 = TotalAlgorithm.Pair()
-        pair_2.value = 10
-        pair_2.ref = 2
-        pair_3 = TotalAlgorithm.Pair()
-        pair_3.value = 11
-        pair_3.ref = 3
-        assert all((
-            pair_1 == pair_2,
-            pair_1 != pair_3
-        ))
-
 class TestBunch():
     def test_bunch(self, piece_factory):
         bunch = Bunch(10)
@@ -96,7 +86,7 @@ class TestTotalAlgorithm():
 
     def test_run_no_bound(self, pieces_no_bound, pair_factory):
         ta = TotalAlgorithm(pieces_no_bound)
-        container = ta._container
+        container = get_container(ta)
         desired_container = [
             [
                 pair_factory(0,None),
@@ -137,7 +127,7 @@ class TestTotalAlgorithm():
         assert container == desired_container
     def test_run_bounded(self, pieces, pair_factory):
         ta = TotalAlgorithm(pieces)
-        container = ta._container
+        container = get_container(ta)
         # for row in container:
         #     for pair in row:
         #         print(pair)
@@ -188,7 +178,7 @@ class TestTotalAlgorithm():
             "upper_bounds": [15,15,15,15,15]
         }
         ta._run(**input_dict)
-        container = ta._container
+        container = get_container(ta)
         desired_container = [
             [
                 pair_factory(0,None),
@@ -238,4 +228,12 @@ class TestTotalAlgorithm():
         with pytest.raises(NotEnoughTypes, match="total") as excinfo:
             ta.get_selected_lengths(3)
         assert 4 == excinfo.value.min_feasible_type_num
-        
\ No newline at end of file
+        
+    def test_frontier(self, pieces):
+        ta = TotalAlgorithm(pieces)
+        assert ta.get_min_feasible_type_num() == 4
+        frontier = ta.get_frontier()
+        assert [frontier[num]['is_feasible'] for num in range(1, 6)] == [False, False, False, True, True]
+        assert frontier[3] == {'selected_lengths': None, 'added_length': float("inf"), 'is_feasible': False}
+        assert frontier[4] == {'selected_lengths': [12, 6, 4, 2], 'added_length': 2, 'is_feasible': True}
+        assert frontier[5]['selected_lengths'] == ta.get_selected_lengths(5) == [12, 6, 4, 2, 1]